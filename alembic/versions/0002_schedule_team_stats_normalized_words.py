@@ -0,0 +1,94 @@
+"""schedule, team stats, normalized words, leaderboard index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:21:02.118524
+
+"""
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.services.arabic.normalize as of this revision; migrations don't import app code
+_STRIP = [*range(0x0610, 0x061B), *range(0x064B, 0x0660), 0x0670, *range(0x06D6, 0x06EE), 0x0640]
+_FOLD = {"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ؤ": "و", "ئ": "ي", "ى": "ي", "ة": "ه"}
+_TABLE = str.maketrans({**{chr(c): None for c in _STRIP}, **_FOLD})
+
+
+def normalize(word: str) -> str:
+    if not word:
+        return ""
+    if not word.isascii():
+        word = unicodedata.normalize("NFKC", word)
+    return word.translate(_TABLE).strip()
+
+
+def _backfill_normalized(bind) -> None:
+    # First row per normalized key wins; later duplicates stay NULL so the unique index builds
+    words = sa.table('dictionary_words', sa.column('id', sa.Integer), sa.column('word', sa.String),
+                     sa.column('normalized_word', sa.String))
+    seen = set(bind.execute(sa.select(words.c.normalized_word).where(words.c.normalized_word.is_not(None))).scalars())
+    rows = []
+    for word_id, word in bind.execute(
+        sa.select(words.c.id, words.c.word).where(words.c.normalized_word.is_(None)).order_by(words.c.id)
+    ):
+        key = normalize(word)
+        if key and key not in seen:
+            seen.add(key)
+            rows.append({"wid": word_id, "key": key})
+    stmt = words.update().where(words.c.id == sa.bindparam("wid")).values(normalized_word=sa.bindparam("key"))
+    for i in range(0, len(rows), 5000):
+        bind.execute(stmt, rows[i:i + 5000])
+
+
+def upgrade() -> None:
+    # Databases booted by the pre-Alembic startup code (create_all) may already have some of these
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    tables = set(insp.get_table_names())
+
+    if 'daily_schedule' not in tables:
+        op.create_table('daily_schedule',
+        sa.Column('day', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('date_key', sa.String(length=10), nullable=False),
+        sa.Column('cycle', sa.Integer(), nullable=False),
+        sa.Column('dictionary_word_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['dictionary_word_id'], ['dictionary_words.id'], ),
+        sa.PrimaryKeyConstraint('day'),
+        sa.UniqueConstraint('date_key')
+        )
+    if 'team_stats' not in tables:
+        op.create_table('team_stats',
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('total_xp', sa.BigInteger(), nullable=False),
+        sa.Column('member_count', sa.Integer(), nullable=False),
+        sa.Column('level_sum', sa.BigInteger(), nullable=False),
+        sa.Column('reconciled_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+        sa.PrimaryKeyConstraint('team_id')
+        )
+    if 'normalized_word' not in {c['name'] for c in insp.get_columns('dictionary_words')}:
+        op.add_column('dictionary_words', sa.Column('normalized_word', sa.String(length=128), nullable=True))
+    _backfill_normalized(bind)
+    if 'ix_dictionary_words_normalized_word' not in {i['name'] for i in insp.get_indexes('dictionary_words')}:
+        op.create_index(op.f('ix_dictionary_words_normalized_word'), 'dictionary_words', ['normalized_word'], unique=True)
+    if 'ix_user_battle_pass_season_xp' not in {i['name'] for i in insp.get_indexes('user_battle_pass')}:
+        op.create_index('ix_user_battle_pass_season_xp', 'user_battle_pass', ['season', 'current_xp'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_battle_pass_season_xp', table_name='user_battle_pass')
+    op.drop_index(op.f('ix_dictionary_words_normalized_word'), table_name='dictionary_words')
+    op.drop_column('dictionary_words', 'normalized_word')
+    op.drop_table('team_stats')
+    op.drop_table('daily_schedule')
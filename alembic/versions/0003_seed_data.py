@@ -0,0 +1,96 @@
+"""seed teams, season S1 tiers and bundled words
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:24:37.560912
+
+"""
+import json
+import unicodedata
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.services.arabic.normalize as of this revision; migrations don't import app code
+_STRIP = [*range(0x0610, 0x061B), *range(0x064B, 0x0660), 0x0670, *range(0x06D6, 0x06EE), 0x0640]
+_FOLD = {"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ؤ": "و", "ئ": "ي", "ى": "ي", "ة": "ه"}
+_TABLE = str.maketrans({**{chr(c): None for c in _STRIP}, **_FOLD})
+
+
+def normalize(word: str) -> str:
+    if not word:
+        return ""
+    if not word.isascii():
+        word = unicodedata.normalize("NFKC", word)
+    return word.translate(_TABLE).strip()
+
+
+def _word_rows(path: Path) -> list[dict]:
+    """Bundled word list -> dictionary_words rows (first spelling of each normalized key wins)."""
+    with open(path, encoding="utf-8-sig") as f:
+        items = json.load(f)
+    rows = {}
+    for item in items:
+        word = (item.get("word") or "").strip()
+        definition = item.get("definition")
+        key = normalize(word)
+        if not key or not definition or len(word) > 128 or key in rows:
+            continue
+        rows[key] = {"word": word, "definition": definition, "normalized_word": key,
+                     "meta": {"root": item.get("root"), "source": item.get("source")}}
+    return list(rows.values())
+
+
+TEAMS = [
+    ("T01", "Team Falcon"), ("T02", "Team Oasis"), ("T03", "Team Dune"),
+    ("T04", "Team Crescent"), ("T05", "Team Palm"), ("T06", "Team Mirage"),
+    ("T07", "Team Sandstorm"), ("T08", "Team Desert Rose"), ("T09", "Team Caravan"),
+    ("T10", "Team Minaret"), ("T11", "Team Date"), ("T12", "Team Saffron"), ("T13", "Team Spice"),
+]
+WORDS_PATH = Path(__file__).resolve().parents[2] / "app" / "data" / "arabic_100_with_roots_with_source.json"
+
+teams = sa.table('teams', sa.column('code', sa.String), sa.column('name', sa.String))
+battle_pass = sa.table('battle_pass', sa.column('season', sa.String), sa.column('level', sa.Integer),
+                       sa.column('xp_required', sa.Integer), sa.column('reward', sa.JSON))
+dictionary_words = sa.table('dictionary_words', sa.column('word', sa.String), sa.column('definition', sa.Text),
+                            sa.column('meta', sa.JSON), sa.column('normalized_word', sa.String))
+
+
+def _empty(bind, table) -> bool:
+    return bind.execute(sa.select(sa.literal(1)).select_from(table).limit(1)).first() is None
+
+
+def upgrade() -> None:
+    # Same "only if empty" rules as the old startup seeding, so existing data is left alone
+    bind = op.get_bind()
+
+    if _empty(bind, teams):
+        op.bulk_insert(teams, [{"code": code, "name": name} for code, name in TEAMS])
+
+    if _empty(bind, battle_pass):
+        # Season S1 levels 1..10, cumulative xp requirements (50, 150, 300, ...)
+        op.bulk_insert(battle_pass, [
+            {"season": "S1", "level": level, "xp_required": level * (level + 1) * 50 // 2, "reward": None}
+            for level in range(1, 11)
+        ])
+
+    if _empty(bind, dictionary_words) and WORDS_PATH.exists():
+        rows = _word_rows(WORDS_PATH)
+        if rows:
+            bind.execute(pg_insert(dictionary_words).on_conflict_do_nothing(index_elements=['normalized_word']), rows)
+
+
+def downgrade() -> None:
+    # Seed data is not removed
+    pass
@@ -0,0 +1,64 @@
+"""dictionary browse indexes
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 11:09:53.135446
+
+"""
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.services.arabic.normalize_root as of this revision; migrations don't import app code
+_STRIP = [*range(0x0610, 0x061B), *range(0x064B, 0x0660), 0x0670, *range(0x06D6, 0x06EE), 0x0640]
+_FOLD = {"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ؤ": "و", "ئ": "ي", "ى": "ي", "ة": "ه"}
+_TABLE = str.maketrans({**{chr(c): None for c in _STRIP}, **_FOLD})
+
+
+def normalize_root(root: str | None) -> str:
+    if not root:
+        return ""
+    if not root.isascii():
+        root = unicodedata.normalize("NFKC", root)
+    return "".join(ch for ch in root.translate(_TABLE).strip() if ch.isalpha())
+
+
+def _backfill_roots(bind) -> None:
+    words = sa.table('dictionary_words', sa.column('id', sa.Integer), sa.column('meta', sa.JSON),
+                     sa.column('root', sa.String))
+    rows = []
+    for word_id, meta in bind.execute(sa.select(words.c.id, words.c.meta).where(words.c.meta.is_not(None))):
+        root = normalize_root(meta.get('root') if isinstance(meta, dict) else None)[:32]
+        if root:
+            rows.append({"wid": word_id, "r": root})
+    stmt = words.update().where(words.c.id == sa.bindparam("wid")).values(root=sa.bindparam("r"))
+    for i in range(0, len(rows), 5000):
+        bind.execute(stmt, rows[i:i + 5000])
+
+
+def upgrade() -> None:
+    # Code point order for the normalized key (rebuilds its unique index); not picked up by autogenerate
+    op.alter_column('dictionary_words', 'normalized_word', type_=sa.String(length=128, collation='C'),
+                    existing_type=sa.String(length=128), existing_nullable=True)
+    op.add_column('dictionary_words', sa.Column('root', sa.String(length=32, collation='C'), nullable=True))
+    _backfill_roots(op.get_bind())
+    op.create_index('ix_dictionary_words_browse', 'dictionary_words', ['normalized_word', 'id'], unique=False)
+    op.create_index('ix_dictionary_words_root_browse', 'dictionary_words', ['root', 'normalized_word', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_dictionary_words_root_browse', table_name='dictionary_words')
+    op.drop_index('ix_dictionary_words_browse', table_name='dictionary_words')
+    op.drop_column('dictionary_words', 'root')
+    op.alter_column('dictionary_words', 'normalized_word', type_=sa.String(length=128),
+                    existing_type=sa.String(length=128, collation='C'), existing_nullable=True)
@@ -0,0 +1,32 @@
+"""db clock created_at
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 11:32:14.540219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stamped by the DB instead of the app, so incremental exports compare like with like;
+    # server default changes aren't picked up by autogenerate
+    for table in ('users', 'game_results'):
+        op.alter_column(table, 'created_at', existing_type=sa.DateTime(), existing_nullable=False,
+                        server_default=sa.text("timezone('UTC', now())"))
+
+
+def downgrade() -> None:
+    for table in ('users', 'game_results'):
+        op.alter_column(table, 'created_at', existing_type=sa.DateTime(), existing_nullable=False,
+                        server_default=None)
@@ -0,0 +1,110 @@
+from contextlib import asynccontextmanager
+from pathlib import Path
+from time import perf_counter
+from sqlalchemy import func, inspect, select, text
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from .config import settings
+from .db import engine, AsyncSessionLocal
+from .deps import riyadh_today
+from .services import battlepass, schedule, team_stats, leaderboard
+from .services.teams import registry as team_registry
+from .services.words import load_index as load_word_index
+
+_ROOT = Path(__file__).resolve().parent.parent
+_MIGRATE_LOCK_ID = 0x4B4C4D00  # pg advisory lock: one process migrates/seeds at a time
+_BASELINE = "0001"
+
+@asynccontextmanager
+async def _phase(name: str):
+    started = perf_counter()
+    yield
+    print(f"⏱ {name}: {(perf_counter() - started) * 1000:.0f} ms")
+
+def _alembic_config(connection=None) -> Config:
+    ini = _ROOT / "alembic.ini"
+    cfg = Config(str(ini)) if ini.exists() else Config()
+    cfg.set_main_option("script_location", str(_ROOT / "alembic"))
+    cfg.attributes["configure_logger"] = False
+    cfg.attributes["connection"] = connection
+    return cfg
+
+_HEAD: str | None = None
+
+def _head() -> str:
+    global _HEAD
+    if _HEAD is None:
+        _HEAD = ScriptDirectory.from_config(_alembic_config()).get_current_head()
+    return _HEAD
+
+def _current_revision(sync_conn) -> str | None:
+    return MigrationContext.configure(sync_conn).get_current_revision()
+
+def _migrate(sync_conn) -> None:
+    cfg = _alembic_config(sync_conn)
+    if _current_revision(sync_conn) is None and inspect(sync_conn).has_table("users"):
+        # Database created by the old create_all startup: adopt it as the baseline
+        command.stamp(cfg, _BASELINE)
+        print(f"✓ Existing schema stamped at revision {_BASELINE}")
+    command.upgrade(cfg, "head")
+
+async def migrate() -> bool:
+    """Bring the schema and seed data to head. Returns True if anything ran.
+
+    Workers that find the database already at head skip the lock entirely; otherwise
+    the first one through the advisory lock migrates and the rest wait, then re-check.
+    """
+    async with engine.connect() as conn:
+        if await conn.run_sync(_current_revision) == _head():
+            return False
+        # Waiting on the lock and backfills can outlast DB_STATEMENT_TIMEOUT_MS
+        await conn.execute(text("SET statement_timeout = 0"))
+        await conn.execute(select(func.pg_advisory_lock(_MIGRATE_LOCK_ID)))
+        await conn.commit()
+        try:
+            if await conn.run_sync(_current_revision) == _head():
+                return False
+            await conn.run_sync(_migrate)
+            await conn.commit()
+            return True
+        finally:
+            await conn.rollback()
+            await conn.execute(select(func.pg_advisory_unlock(_MIGRATE_LOCK_ID)))
+            await conn.execute(text("RESET statement_timeout"))
+            await conn.commit()
+
+async def warm_caches() -> None:
+    """Per-worker in-memory state; each of these also loads lazily on first use."""
+    async with AsyncSessionLocal() as db:
+        async with _phase("team registry"):
+            await team_registry.refresh(db)
+        async with _phase("team stats"):
+            # Build the summary once if it is missing, else just load it
+            await team_stats.refresh_snapshot(db)
+            if set(team_stats.snapshot()) != set(team_registry.by_id):
+                await team_stats.reconcile(db)
+        async with _phase("leaderboard"):
+            ranking = await leaderboard.load(db, await battlepass.active_season(db))
+            print(f"✓ Leaderboard loaded ({ranking.total} players)")
+        async with _phase("daily schedule"):
+            # Materialize the schedule ahead of today so /api/daily is a single lookup
+            horizon = await schedule.extend_schedule(
+                db, schedule.day_index(riyadh_today()) + settings.DAILY_SCHEDULE_LOOKAHEAD_DAYS
+            )
+            print(f"✓ Daily schedule ready through day {horizon}")
+        async with _phase("word index"):
+            index = await load_word_index(db)
+            print(f"✓ Word index loaded ({len(index)} entries)")
+
+async def run() -> None:
+    started = perf_counter()
+    if settings.FAST_START:
+        print("✓ FAST_START: skipping migrations and cache warm-up")
+    else:
+        async with _phase("migrations"):
+            if await migrate():
+                print(f"✓ Database migrated to {_head()}")
+        await warm_caches()
+    print(f"⏱ startup total: {(perf_counter() - started) * 1000:.0f} ms")
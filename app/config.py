@@ -1,16 +1,121 @@
 from pydantic import BaseModel
 import os
 
+def _env_bool(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
 class Settings(BaseModel):
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    # Connection pool. DB_PRE_PING: "always" (ping every checkout), "idle" (only after
+    # DB_PRE_PING_IDLE_SECONDS unused) or "off"
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_PRE_PING: str = os.getenv("DB_PRE_PING", "idle")
+    DB_PRE_PING_IDLE_SECONDS: float = float(os.getenv("DB_PRE_PING_IDLE_SECONDS", "30"))
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+    # Optional read replica for read-only routes; pool sizing follows DB_POOL_*. A user's reads
+    # stick to the primary for REPLICA_STICKY_SECONDS after they write, and all reads go to
+    # the primary while the replica is unreachable or more than REPLICA_MAX_LAG_SECONDS behind
+    DATABASE_REPLICA_URL: str = os.getenv("DATABASE_REPLICA_URL", "")
+    REPLICA_STICKY_SECONDS: float = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+    REPLICA_STICKY_MAX_USERS: int = int(os.getenv("REPLICA_STICKY_MAX_USERS", "100000"))
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    REPLICA_CHECK_INTERVAL_SECONDS: float = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "2"))
+    # /api/admin/export: its own pool (also the cap on concurrent exports) so slow downloads never
+    # hold request connections, rows fetched per server-side cursor round trip, and a statement
+    # timeout of its own (0 = none; a big export is one long statement)
+    EXPORT_POOL_SIZE: int = int(os.getenv("EXPORT_POOL_SIZE", "2"))
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+    EXPORT_STATEMENT_TIMEOUT_MS: int = int(os.getenv("EXPORT_STATEMENT_TIMEOUT_MS", "0"))
+    # Per-request query stats: X-DB-* response headers when DEBUG, warning above the budget
+    DEBUG: bool = _env_bool("DEBUG")
+    DB_QUERY_BUDGET: int = int(os.getenv("DB_QUERY_BUDGET", "15"))
+    # /metrics: how often the event-loop lag probe wakes up
+    METRICS_LOOP_LAG_INTERVAL_SECONDS: float = float(os.getenv("METRICS_LOOP_LAG_INTERVAL_SECONDS", "0.5"))
     JWT_SECRET: str = os.getenv("JWT_SECRET", "dev")
     JWT_ALG: str = os.getenv("JWT_ALG", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "43200"))
+    # Verified-token LRU and short-lived profile cache behind deps.current_user
+    AUTH_TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+    AUTH_PROFILE_CACHE_SIZE: int = int(os.getenv("AUTH_PROFILE_CACHE_SIZE", "10000"))
+    AUTH_PROFILE_TTL_SECONDS: float = float(os.getenv("AUTH_PROFILE_TTL_SECONDS", "30"))
+    # Comma-separated emails allowed to use /api/admin
+    ADMIN_EMAILS: frozenset[str] = frozenset(
+        e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()
+    )
     GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID", "")
     GOOGLE_CLIENT_SECRET: str = os.getenv("GOOGLE_CLIENT_SECRET", "")
     OAUTH_REDIRECT_URI: str = os.getenv("OAUTH_REDIRECT_URI", "")
+    # Point at a local stand-in OIDC server in dev/tests
+    GOOGLE_DISCOVERY_URL: str = os.getenv("GOOGLE_DISCOVERY_URL", "https://accounts.google.com/.well-known/openid-configuration")
+    # id_token signature algorithms we accept; never taken from the provider's metadata
+    OIDC_ID_TOKEN_ALGORITHMS: list[str] = [
+        a.strip() for a in os.getenv("OIDC_ID_TOKEN_ALGORITHMS", "RS256").split(",") if a.strip()
+    ]
+    # Discovery/JWKS cache lifetime (a shorter Cache-Control max-age wins) and outbound client pool
+    OIDC_METADATA_TTL_SECONDS: float = float(os.getenv("OIDC_METADATA_TTL_SECONDS", "3600"))
+    OIDC_HTTP_TIMEOUT_SECONDS: float = float(os.getenv("OIDC_HTTP_TIMEOUT_SECONDS", "10"))
+    OIDC_HTTP_MAX_CONNECTIONS: int = int(os.getenv("OIDC_HTTP_MAX_CONNECTIONS", "20"))
+    # Password hashing: bcrypt cost and the worker pool it runs on ("thread" or "process")
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_POOL_MODE: str = os.getenv("PASSWORD_POOL_MODE", "thread")
+    PASSWORD_POOL_WORKERS: int = int(os.getenv("PASSWORD_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_POOL_QUEUE: int = int(os.getenv("PASSWORD_POOL_QUEUE", "32"))
+    # Token-bucket limits on the bcrypt endpoints (per client IP and per login email)
+    RATE_LIMIT_ENABLED: bool = _env_bool("RATE_LIMIT_ENABLED", "1")
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    # Reverse proxies in front of the app (1 on Railway): the client IP is the X-Forwarded-For
+    # entry that many hops from the right, so a client can't spoof it. 0 = use the peer address
+    RATE_LIMIT_PROXY_HOPS: int = int(os.getenv("RATE_LIMIT_PROXY_HOPS", "0"))
+    LOGIN_RATE_IP_PER_MINUTE: float = float(os.getenv("LOGIN_RATE_IP_PER_MINUTE", "30"))
+    LOGIN_RATE_IP_BURST: int = int(os.getenv("LOGIN_RATE_IP_BURST", "10"))
+    LOGIN_RATE_EMAIL_PER_MINUTE: float = float(os.getenv("LOGIN_RATE_EMAIL_PER_MINUTE", "5"))
+    LOGIN_RATE_EMAIL_BURST: int = int(os.getenv("LOGIN_RATE_EMAIL_BURST", "5"))
+    REGISTER_RATE_IP_PER_MINUTE: float = float(os.getenv("REGISTER_RATE_IP_PER_MINUTE", "10"))
+    REGISTER_RATE_IP_BURST: int = int(os.getenv("REGISTER_RATE_IP_BURST", "5"))
     # Game settings
     TIMEZONE: str = "Asia/Riyadh"
-    BATTLEPASS_DEFAULT_SEASON: str = "S1"
+    # Active season until the seasons table names one (after migration 0005 it always does)
+    BATTLEPASS_DEFAULT_SEASON: str = os.getenv("BATTLEPASS_DEFAULT_SEASON", "S1")
+    # Daily schedule: rows are materialized this many days ahead of today
+    DAILY_SCHEDULE_SEED: str = os.getenv("DAILY_SCHEDULE_SEED", "klm")
+    DAILY_SCHEDULE_LOOKAHEAD_DAYS: int = int(os.getenv("DAILY_SCHEDULE_LOOKAHEAD_DAYS", "30"))
+    DAILY_SCHEDULE_MAX_AHEAD_DAYS: int = int(os.getenv("DAILY_SCHEDULE_MAX_AHEAD_DAYS", "366"))
+    DAILY_RANGE_MAX_DAYS: int = int(os.getenv("DAILY_RANGE_MAX_DAYS", "62"))
+    DAILY_GUESS_MAX_BATCH: int = int(os.getenv("DAILY_GUESS_MAX_BATCH", "50"))
+    WORDS_VALIDATE_MAX_BATCH: int = int(os.getenv("WORDS_VALIDATE_MAX_BATCH", "100"))
+    WORDS_PAGE_MAX: int = int(os.getenv("WORDS_PAGE_MAX", "200"))
+    # Write-behind XP grants: coalesced per user, flushed every interval or at max entries
+    XP_WRITE_BEHIND: bool = _env_bool("XP_WRITE_BEHIND")
+    XP_FLUSH_INTERVAL_MS: int = int(os.getenv("XP_FLUSH_INTERVAL_MS", "250"))
+    XP_FLUSH_MAX_ENTRIES: int = int(os.getenv("XP_FLUSH_MAX_ENTRIES", "500"))
+    # Game results: XP per finished puzzle and the batched writer that records them
+    GAME_MAX_GUESSES: int = int(os.getenv("GAME_MAX_GUESSES", "6"))
+    GAME_XP_WIN: int = int(os.getenv("GAME_XP_WIN", "50"))
+    GAME_XP_PER_SPARE_GUESS: int = int(os.getenv("GAME_XP_PER_SPARE_GUESS", "10"))
+    GAME_XP_LOSS: int = int(os.getenv("GAME_XP_LOSS", "10"))
+    GAME_RESULTS_FLUSH_INTERVAL_MS: int = int(os.getenv("GAME_RESULTS_FLUSH_INTERVAL_MS", "250"))
+    GAME_RESULTS_FLUSH_MAX_ENTRIES: int = int(os.getenv("GAME_RESULTS_FLUSH_MAX_ENTRIES", "500"))
+    # Results queued while flushes fail; past this submissions get 503 instead of growing memory
+    GAME_RESULTS_MAX_PENDING: int = int(os.getenv("GAME_RESULTS_MAX_PENDING", "50000"))
+    # Write-behind buffers: after this many failed flushes in a row, write entries one by one
+    # and drop those rejected on their own (services/write_behind.py)
+    WRITE_BEHIND_ISOLATE_AFTER: int = int(os.getenv("WRITE_BEHIND_ISOLATE_AFTER", "3"))
+    # Team leaderboard: reload the summary snapshot / rebuild it from scratch every N seconds
+    TEAM_STATS_REFRESH_SECONDS: float = float(os.getenv("TEAM_STATS_REFRESH_SECONDS", "10"))
+    TEAM_STATS_RECONCILE_SECONDS: float = float(os.getenv("TEAM_STATS_RECONCILE_SECONDS", "600"))
+    # Player leaderboard: xp bucket width of the rank tree, rebuild period, max page size
+    LEADERBOARD_BUCKET_XP: int = int(os.getenv("LEADERBOARD_BUCKET_XP", "50"))
+    LEADERBOARD_REBUILD_SECONDS: float = float(os.getenv("LEADERBOARD_REBUILD_SECONDS", "300"))
+    LEADERBOARD_PAGE_MAX: int = int(os.getenv("LEADERBOARD_PAGE_MAX", "100"))
+    # Cross-worker cache invalidation (LISTEN/NOTIFY): channel, listener keepalive, reconnect backoff cap
+    INVALIDATION_ENABLED: bool = _env_bool("INVALIDATION_ENABLED", "1")
+    INVALIDATION_CHANNEL: str = os.getenv("INVALIDATION_CHANNEL", "klm_invalidate")
+    INVALIDATION_KEEPALIVE_SECONDS: float = float(os.getenv("INVALIDATION_KEEPALIVE_SECONDS", "15"))
+    INVALIDATION_BACKOFF_MAX_SECONDS: float = float(os.getenv("INVALIDATION_BACKOFF_MAX_SECONDS", "30"))
+    # Skip migrations and cache warm-up at boot (caches then load on first request)
+    FAST_START: bool = _env_bool("FAST_START")
 
 settings = Settings()
@@ -1,16 +1,284 @@
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from time import monotonic, perf_counter
+from fastapi import Depends, Header
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError, DisconnectionError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from .config import settings
 
-# Convert postgresql:// to postgresql+asyncpg:// for async support
+def _async_url(url: str) -> str:
+    # Convert postgresql:// to postgresql+asyncpg:// for async support
+    if url.startswith("postgresql://") and "+asyncpg" not in url:
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
 db_url = settings.DATABASE_URL
 if not db_url:
     raise ValueError("DATABASE_URL environment variable is not set")
-if db_url.startswith("postgresql://") and "+asyncpg" not in db_url:
-    db_url = db_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+db_url = _async_url(db_url)
+
+class RequestDBStats:
+    __slots__ = ("queries", "db_ms", "pool_wait_ms")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.pool_wait_ms = 0.0
+
+# Set per request by the middleware in main.py; None outside a request (startup, background tasks)
+request_db_stats: ContextVar[RequestDBStats | None] = ContextVar("request_db_stats", default=None)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that times checkouts (waiting for a free slot, or opening a new connection)."""
+
+    waits = 0
+    wait_ms = 0.0
+
+    def _do_get(self):
+        t0 = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            ms = (perf_counter() - t0) * 1000
+            InstrumentedPool.waits += 1
+            InstrumentedPool.wait_ms += ms
+            stats = request_db_stats.get()
+            if stats is not None:
+                stats.pool_wait_ms += ms
+
+_server_settings = {}
+if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+    _server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+
+def _create_engine(url: str, pool_size: int | None = None, max_overflow: int | None = None,
+                   server_settings: dict | None = None):
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE if pool_size is None else pool_size,
+        max_overflow=settings.DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_PRE_PING == "always",
+        connect_args={"server_settings": _server_settings if server_settings is None else server_settings},
+    )
 
-engine = create_async_engine(db_url, echo=False, pool_pre_ping=True)
+engine = _create_engine(db_url)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
+def _instrument(engine) -> None:
+    if settings.DB_PRE_PING == "idle":
+        @event.listens_for(engine.sync_engine, "checkin")
+        def _mark_idle(dbapi_connection, connection_record):
+            connection_record.info["checked_in"] = monotonic()
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _check_alive(dbapi_connection, connection_record, connection_proxy):
+        # Raising makes the pool discard this connection and retry the checkout with a fresh one.
+        # Free check first: the server already closed it (restart, failover, terminated backend)
+        if dbapi_connection.driver_connection.is_closed():
+            raise DisconnectionError("closed pooled connection")
+        # Ping only connections that sat unused long enough for a proxy/server to drop them
+        checked_in = connection_record.info.get("checked_in")
+        if checked_in is None or monotonic() - checked_in < settings.DB_PRE_PING_IDLE_SECONDS:
+            return
+        try:
+            alive = engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        if not alive:
+            raise DisconnectionError("stale pooled connection")
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _query_start(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _query_end(conn, cursor, statement, parameters, context, executemany):
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_ms += (perf_counter() - conn.info.pop("query_start", perf_counter())) * 1000
+
+_instrument(engine)
+
+def pool_stats() -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+        "idle": pool.checkedin(),
+        "checkouts": InstrumentedPool.waits,
+        "avg_wait_ms": round(InstrumentedPool.wait_ms / InstrumentedPool.waits, 3) if InstrumentedPool.waits else 0.0,
+    }
+
+# Admin exports (services/export.py): primary, so their watermarks line up with committed writes,
+# but a separate small pool, so a long download can't take a request connection
+EXPORT_APP_NAME = "klm-export"
+export_engine = _create_engine(
+    db_url, pool_size=settings.EXPORT_POOL_SIZE, max_overflow=0,
+    server_settings={**_server_settings, "statement_timeout": str(settings.EXPORT_STATEMENT_TIMEOUT_MS),
+                     "application_name": EXPORT_APP_NAME},
+)
+_instrument(export_engine)
+
 async def get_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
+
+# --- Read replica (optional) ---
+# Read-only handlers take get_read_session. It serves them from the replica unless it is
+# unset, unreachable or lagging, or the caller wrote within REPLICA_STICKY_SECONDS.
+replica_engine = _create_engine(_async_url(settings.DATABASE_REPLICA_URL)) if settings.DATABASE_REPLICA_URL else None
+ReplicaSessionLocal = (
+    async_sessionmaker(replica_engine, expire_on_commit=False, class_=AsyncSession, info={"replica": True})
+    if replica_engine is not None else None
+)
+if replica_engine is not None:
+    _instrument(replica_engine)
+
+_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() <= pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+class ReplicaRouter:
+    """Replica health (probed every REPLICA_CHECK_INTERVAL_SECONDS) and per-user stickiness."""
+
+    def __init__(self):
+        self.healthy = False
+        self.lag_seconds: float | None = None
+        self._sticky: "OrderedDict[int, float]" = OrderedDict()
+        self._task: asyncio.Task | None = None
+        # metrics
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.fallbacks = 0
+
+    def mark_written(self, user_id: int) -> None:
+        """This user's next reads go to the primary for REPLICA_STICKY_SECONDS."""
+        if replica_engine is None:
+            return
+        now = monotonic()
+        self._sticky[user_id] = now + settings.REPLICA_STICKY_SECONDS
+        self._sticky.move_to_end(user_id)
+        # Deadlines are in insertion order, so expired entries sit at the front
+        while self._sticky:
+            deadline = next(iter(self._sticky.values()))
+            if deadline > now and len(self._sticky) <= settings.REPLICA_STICKY_MAX_USERS:
+                break
+            self._sticky.popitem(last=False)
+
+    def is_sticky(self, user_id: int | None) -> bool:
+        deadline = self._sticky.get(user_id) if user_id is not None else None
+        return deadline is not None and deadline > monotonic()
+
+    def failed(self, error: Exception) -> None:
+        if self.healthy:
+            print(f"⚠ Read replica unavailable, reading from primary: {error}")
+        self.healthy = False
+        self.fallbacks += 1
+
+    async def probe(self) -> None:
+        try:
+            async with replica_engine.connect() as conn:
+                lag = float(await conn.scalar(_LAG_SQL) or 0)
+        except Exception as e:
+            self.lag_seconds = None
+            self.failed(e)
+            return
+        self.lag_seconds = lag
+        healthy = lag <= settings.REPLICA_MAX_LAG_SECONDS
+        if healthy != self.healthy:
+            print(f"✓ Read replica in use (lag {lag:.1f}s)" if healthy else f"⚠ Read replica lagging {lag:.1f}s, reading from primary")
+        self.healthy = healthy
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(settings.REPLICA_CHECK_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        if replica_engine is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        out = {
+            "configured": replica_engine is not None,
+            "healthy": self.healthy,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "fallbacks": self.fallbacks,
+            "sticky_users": len(self._sticky),
+        }
+        if self.lag_seconds is not None:
+            out["lag_seconds"] = round(self.lag_seconds, 3)
+        if replica_engine is not None:
+            out["pool_checked_out"] = replica_engine.pool.checkedout()
+        return out
+
+replica = ReplicaRouter()
+
+def token_user_id(authorization: str | None) -> int | None:
+    from .services.identity import InvalidToken, user_id_for_token
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return user_id_for_token(authorization.split(" ", 1)[1])
+    except InvalidToken:
+        return None
+
+async def get_read_session(authorization: str | None = Header(None),
+                           primary: AsyncSession = Depends(get_session)) -> AsyncSession:
+    # The primary session is shared with the route's own get_session and only connects if used
+    if replica_engine is None or not replica.healthy:
+        replica.primary_reads += 1
+        yield primary
+        return
+    if replica.is_sticky(token_user_id(authorization)):
+        replica.sticky_reads += 1
+        yield primary
+        return
+    session = ReplicaSessionLocal()
+    try:
+        await session.connection()
+    except (OSError, DBAPIError) as e:
+        await session.close()
+        replica.failed(e)
+        yield primary
+        return
+    replica.replica_reads += 1
+    try:
+        yield session
+    finally:
+        await session.close()
+
+def is_replica(db: AsyncSession) -> bool:
+    return bool(db.info.get("replica"))
+
+@asynccontextmanager
+async def on_primary(db: AsyncSession, when: bool = True):
+    """`db` itself, or a short-lived primary session when `db` reads from the replica and
+    the block may write (or must see rows it just wrote)."""
+    if not when or not is_replica(db):
+        yield db
+        return
+    async with AsyncSessionLocal() as session:
+        yield session
@@ -1,11 +1,45 @@
 from zoneinfo import ZoneInfo
-from datetime import datetime, date
+from datetime import datetime, date, time, timedelta
+from fastapi import Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from .config import settings
+from .db import get_read_session
+from .services.identity import CurrentUser, InvalidToken, user_id_for_token, get_profile
 
 def riyadh_today() -> date:
     tz = ZoneInfo(settings.TIMEZONE)
     return datetime.now(tz).date()
 
+def seconds_until_riyadh_midnight() -> int:
+    """Time left in the current Riyadh day; day-scoped responses are cacheable this long."""
+    tz = ZoneInfo(settings.TIMEZONE)
+    now = datetime.now(tz)
+    midnight = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=tz)
+    return max(1, int((midnight - now).total_seconds()))
+
 def date_key(d: date | None = None) -> str:
     d = d or riyadh_today()
     return d.isoformat()
+
+async def current_user_id(authorization: str | None = Header(None)) -> int:
+    """User id from the bearer token; no DB access. Async so it runs on the event loop,
+    not the threadpool: the token cache isn't thread-safe."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(401, "Missing token")
+    try:
+        return user_id_for_token(authorization.split(" ", 1)[1])
+    except InvalidToken:
+        raise HTTPException(401, "Invalid token")
+
+async def current_user(user_id: int = Depends(current_user_id),
+                       db: AsyncSession = Depends(get_read_session)) -> CurrentUser:
+    """Cached profile (user + team code); only touches the DB on a cache miss."""
+    user = await get_profile(db, user_id)
+    if user is None:
+        raise HTTPException(401, "Unknown user")
+    return user
+
+async def admin_user(user: CurrentUser = Depends(current_user)) -> CurrentUser:
+    if user.email.lower() not in settings.ADMIN_EMAILS:
+        raise HTTPException(403, "Admin only")
+    return user
@@ -1,11 +1,18 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import auth, users, daily, battlepass, teams
-from .db import engine, AsyncSessionLocal
-from .models import Base, Team, DictionaryWord, BattlePass
-from sqlalchemy import select
-import json
-from pathlib import Path
+from fastapi.responses import JSONResponse, PlainTextResponse
+from .routers import auth, users, daily, battlepass, teams, words, admin
+from .config import settings
+from .db import pool_stats, replica, replica_engine
+from .middleware import QueryStatsMiddleware, ReadYourWritesMiddleware
+from . import metrics
+from . import bootstrap
+from .services.xp_buffer import buffer as xp_buffer
+from .services import team_stats, leaderboard, oidc, game_results, invalidation, export
+from .services.write_behind import BufferFull
+from .services.battlepass import current_season
+from .security import password_pool, PasswordPoolBusy
+from . import ratelimit
 
 
 app = FastAPI(title="Arabic Wordle Backend")
@@ -17,7 +24,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "X-DB-Time-Ms", "X-DB-Pool-Wait-Ms"],
 )
+app.add_middleware(QueryStatsMiddleware)
+if replica_engine is not None:
+    app.add_middleware(ReadYourWritesMiddleware)
+# Outermost, so its latency covers the whole stack
+app.add_middleware(metrics.MetricsMiddleware)
 
 # Routers
 app.include_router(auth.router, prefix="/api")
@@ -25,58 +38,78 @@ app.include_router(users.router, prefix="/api")
 app.include_router(daily.router, prefix="/api")
 app.include_router(battlepass.router, prefix="/api")
 app.include_router(teams.router, prefix="/api")
+app.include_router(words.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 
-@app.on_event("startup")
-async def on_startup():
-    try:
-        # Ensure tables exist
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+@app.exception_handler(PasswordPoolBusy)
+async def password_pool_busy(request: Request, exc: PasswordPoolBusy):
+    return JSONResponse({"detail": "Server busy, try again"}, status_code=503, headers={"Retry-After": "1"})
 
-        # Seed teams, battle pass, and words if empty
-        async with AsyncSessionLocal() as db:
-            # Teams (13)
-            res = await db.execute(select(Team.id))
-            if not res.first():
-                teams_data = [
-                    ("T01", "Team Falcon"), ("T02", "Team Oasis"), ("T03", "Team Dune"),
-                    ("T04", "Team Crescent"), ("T05", "Team Palm"), ("T06", "Team Mirage"),
-                    ("T07", "Team Sandstorm"), ("T08", "Team Desert Rose"), ("T09", "Team Caravan"),
-                    ("T10", "Team Minaret"), ("T11", "Team Date"), ("T12", "Team Saffron"), ("T13", "Team Spice"),
-                ]
-                for code, name in teams_data:
-                    db.add(Team(code=code, name=name))
-                await db.commit()
-                print("✓ Teams seeded")
+@app.exception_handler(BufferFull)
+async def buffer_full(request: Request, exc: BufferFull):
+    return JSONResponse({"detail": "Server busy, try again"}, status_code=503, headers={"Retry-After": "1"})
 
-            # Battle pass basic season S1 levels (1..10)
-            res_bp = await db.execute(select(BattlePass.id))
-            if not res_bp.first():
-                for level in range(1, 11):
-                    # cumulative xp requirements (e.g., 100, 300, 600, ...)
-                    xp_required = level * (level + 1) * 50 // 2
-                    db.add(BattlePass(season="S1", level=level, xp_required=xp_required, reward=None))
-                await db.commit()
-                print("✓ Battle pass seeded")
+@app.exception_handler(ratelimit.RateLimited)
+async def rate_limited(request: Request, exc: ratelimit.RateLimited):
+    return JSONResponse({"detail": "Too many attempts, try again later"}, status_code=429,
+                        headers={"Retry-After": exc.header()})
 
-            # Words from bundled JSON if table empty
-            res_w = await db.execute(select(DictionaryWord.id))
-            if not res_w.first():
-                data_path = Path(__file__).parent / "data" / "arabic_100_with_roots_with_source.json"
-                if data_path.exists():
-                    items = json.loads(data_path.read_text(encoding="utf-8"))
-                    for item in items:
-                        meta = {"root": item.get("root"), "source": item.get("source")}
-                        db.add(DictionaryWord(word=item.get("word"), definition=item.get("definition"), meta=meta))
-                    await db.commit()
-                    print(f"✓ {len(items)} words seeded")
-                else:
-                    print(f"⚠ Words file not found: {data_path}")
+@app.on_event("startup")
+async def on_startup():
+    metrics.register_routes(app.routes)
+    metrics.loop_lag.start()
+    try:
+        # Migrations + seed data (once, under an advisory lock), then per-worker caches
+        await bootstrap.run()
     except Exception as e:
         import traceback
         print(f"⚠ Startup error: {e}")
         print(traceback.format_exc())
 
+    if settings.XP_WRITE_BEHIND:
+        xp_buffer.start()
+    game_results.buffer.start()
+    invalidation.start()
+    replica.start()
+    team_stats.start()
+    leaderboard.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # Drain buffered XP and game results before the worker exits
+    await metrics.loop_lag.stop()
+    await invalidation.stop()
+    await replica.stop()
+    await leaderboard.stop()
+    await xp_buffer.stop()
+    await game_results.buffer.stop()
+    # After the buffers: their last flushes queue team deltas
+    await team_stats.stop()
+    password_pool.shutdown()
+    await oidc.google.aclose()
+
 @app.get("/health")
 async def health():
-    return {"ok": True}
+    out = {"ok": True, "password_pool": password_pool.stats(), "oidc": oidc.google.stats(),
+           "db_pool": pool_stats(), "game_results": game_results.buffer.stats(), "rate_limits": ratelimit.stats(),
+           "invalidation": invalidation.stats(), "replica": replica.stats(), "export": export.stats()}
+    if settings.XP_WRITE_BEHIND:
+        out["xp_buffer"] = xp_buffer.stats()
+    return out
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    extra = {
+        "klm_db_pool": pool_stats(),
+        "klm_password_pool": password_pool.stats(),
+        **{f"klm_oidc_{call}": s for call, s in oidc.google.stats()["calls"].items()},
+        "klm_leaderboard": {"players": leaderboard.player_count(current_season())},
+        "klm_game_results": game_results.buffer.stats(),
+        **{f"klm_ratelimit_{name}": s for name, s in ratelimit.stats().items()},
+        "klm_invalidation": invalidation.stats(),
+        "klm_replica": replica.stats(),
+        "klm_export": export.stats(),
+    }
+    if settings.XP_WRITE_BEHIND:
+        extra["klm_xp_buffer"] = xp_buffer.stats()
+    return PlainTextResponse(metrics.render(extra), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,139 @@
+import asyncio
+from bisect import bisect_left
+from time import perf_counter
+from .config import settings
+
+# Latency buckets in seconds (Prometheus convention); +Inf is the implicit last slot
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_LE = [*(f"{b:g}" for b in BUCKETS), "+Inf"]
+
+class Series:
+    """Counters + latency histogram for one (route, method). Everything is allocated
+    up front; observing a request only bumps ints and floats."""
+
+    __slots__ = ("labels", "buckets", "sum", "count", "statuses")
+
+    def __init__(self, route: str, method: str):
+        self.labels = f'method="{method}",route="{route}"'
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.statuses: dict[int, int] = {}
+
+    def observe(self, seconds: float, status: int) -> None:
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        statuses = self.statuses
+        statuses[status] = statuses.get(status, 0) + 1
+
+# id(route) -> method -> Series, filled by register_routes() (routes aren't hashable)
+_SERIES: dict[int, dict[str, Series]] = {}
+_UNMATCHED: dict[str, Series] = {}
+
+def register_routes(routes) -> None:
+    for route in routes:
+        methods = getattr(route, "methods", None)
+        if methods and id(route) not in _SERIES:
+            _SERIES[id(route)] = {m: Series(route.path, m) for m in methods}
+
+_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+def _unmatched(method: str) -> Series:
+    # Bounded: arbitrary client-sent methods share one series
+    if method not in _METHODS:
+        method = "OTHER"
+    series = _UNMATCHED.get(method)
+    if series is None:
+        series = _UNMATCHED[method] = Series("<unmatched>", method)
+    return series
+
+class MetricsMiddleware:
+    """Per-route request counts by status and latency histograms; served at /metrics."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = 500
+        t0 = perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - t0
+            by_method = _SERIES.get(id(scope.get("route")))
+            series = by_method.get(scope["method"]) if by_method else None
+            (series or _unmatched(scope["method"])).observe(elapsed, status)
+
+# --- event loop lag ---
+class LoopLag:
+    def __init__(self):
+        self.last = 0.0
+        self.max = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            t0 = perf_counter()
+            await asyncio.sleep(interval)
+            lag = max(0.0, perf_counter() - t0 - interval)
+            self.last = lag
+            self.max = max(self.max, lag)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(settings.METRICS_LOOP_LAG_INTERVAL_SECONDS))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+loop_lag = LoopLag()
+
+# --- exposition ---
+def _gauges(out: list[str], prefix: str, stats: dict) -> None:
+    for name, value in stats.items():
+        if isinstance(value, (int, float)):
+            out.append(f"{prefix}_{name} {int(value) if isinstance(value, bool) else value}")
+
+def render(extra: dict[str, dict] | None = None) -> str:
+    """Prometheus text format (0.0.4). `extra` maps a metric prefix to a flat stats dict."""
+    out = [
+        "# TYPE klm_http_requests_total counter",
+        "# TYPE klm_http_request_duration_seconds histogram",
+    ]
+    all_series = [s for by_method in _SERIES.values() for s in by_method.values()] + list(_UNMATCHED.values())
+    for s in all_series:
+        if not s.count:
+            continue
+        for status, n in sorted(s.statuses.items()):
+            out.append(f'klm_http_requests_total{{{s.labels},status="{status}"}} {n}')
+        cumulative = 0
+        for le, n in zip(_LE, s.buckets):
+            cumulative += n
+            out.append(f'klm_http_request_duration_seconds_bucket{{{s.labels},le="{le}"}} {cumulative}')
+        out.append(f"klm_http_request_duration_seconds_sum{{{s.labels}}} {s.sum:.6f}")
+        out.append(f"klm_http_request_duration_seconds_count{{{s.labels}}} {s.count}")
+    out.append("# TYPE klm_event_loop_lag_seconds gauge")
+    out.append(f"klm_event_loop_lag_seconds {loop_lag.last:.6f}")
+    # Worst lag since the previous scrape
+    out.append(f"klm_event_loop_lag_max_seconds {loop_lag.max:.6f}")
+    loop_lag.max = loop_lag.last
+    for prefix, stats in (extra or {}).items():
+        _gauges(out, prefix, stats)
+    out.append("")
+    return "\n".join(out)
@@ -0,0 +1,66 @@
+from .config import settings
+from .db import RequestDBStats, request_db_stats, replica, token_user_id
+
+def route_path(scope) -> str:
+    # Route template (/api/users/{id}) once routing has run, raw path before that / on 404
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope["path"]
+
+class QueryStatsMiddleware:
+    """
+    Per-request query count, DB time and pool-wait time (collected by the engine
+    hooks in db.py). Sent as X-DB-* headers when DEBUG; requests that run more than
+    DB_QUERY_BUDGET queries are logged so N+1 patterns show up.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestDBStats()
+        token = request_db_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-db-queries", str(stats.queries).encode()),
+                    (b"x-db-time-ms", f"{stats.db_ms:.1f}".encode()),
+                    (b"x-db-pool-wait-ms", f"{stats.pool_wait_ms:.1f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            request_db_stats.reset(token)
+            if stats.queries > settings.DB_QUERY_BUDGET:
+                print(f"⚠ Query budget exceeded: {scope['method']} {route_path(scope)} ran {stats.queries} queries "
+                      f"(budget {settings.DB_QUERY_BUDGET}, db {stats.db_ms:.1f} ms, pool wait {stats.pool_wait_ms:.1f} ms)")
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+class ReadYourWritesMiddleware:
+    """
+    Marks the caller sticky to the primary (db.replica) when an authenticated write
+    succeeds, before the response goes out, so their next reads see it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def send_marking(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                authorization = next((v for k, v in scope["headers"] if k == b"authorization"), None)
+                user_id = token_user_id(authorization.decode("latin-1")) if authorization else None
+                if user_id is not None:
+                    replica.mark_written(user_id)
+            await send(message)
+
+        await self.app(scope, receive, send_marking)
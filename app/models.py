@@ -1,6 +1,6 @@
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, ForeignKey, Boolean, DateTime, UniqueConstraint, JSON, Text
+from sqlalchemy import String, Integer, BigInteger, ForeignKey, Boolean, DateTime, UniqueConstraint, Index, JSON, Text, func
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase
 
@@ -15,13 +15,26 @@ class Team(Base):
 
     users = relationship("User", back_populates="team")
 
+class TeamStats(Base):
+    """
+    Per-team leaderboard aggregates, updated incrementally on team changes, every few seconds
+    with the XP granted since (batched per worker), and periodically reconciled against users/user_battle_pass (services/team_stats.py).
+    """
+    __tablename__ = "team_stats"
+    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id"), primary_key=True)
+    total_xp: Mapped[int] = mapped_column(BigInteger, default=0)
+    member_count: Mapped[int] = mapped_column(Integer, default=0)
+    level_sum: Mapped[int] = mapped_column(BigInteger, default=0)   # members without progress count as level 1
+    reconciled_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
 class User(Base):
     __tablename__ = "users"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     email: Mapped[str] = mapped_column(String(320), unique=True, index=True)
     hashed_password: Mapped[str | None] = mapped_column(String(255), nullable=True)  # None for OAuth-only
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # The DB's clock (UTC), like the export watermark it's compared to
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.timezone("UTC", func.now()))
     team_id: Mapped[int | None] = mapped_column(ForeignKey("teams.id"), nullable=True)
     display_name: Mapped[str | None] = mapped_column(String(80), nullable=True)
     google_sub: Mapped[str | None] = mapped_column(String(128), unique=True, index=True)  # Google user id
@@ -34,8 +47,19 @@ class DictionaryWord(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     word: Mapped[str] = mapped_column(String(128), index=True)         # with tashkeel if you want
     definition: Mapped[str] = mapped_column(Text)
+    # services.arabic.normalize(word); dedup key for imports. "C" collation: code point order,
+    # so btrees on it serve equality, prefix ranges and the keyset order of /api/words
+    normalized_word: Mapped[str | None] = mapped_column(String(128, collation="C"), unique=True, index=True, nullable=True)
     # Optional metadata (source, root, rarity, etc.)
     meta: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # services.arabic.normalize_root(meta["root"]): "ك-ت-ب" -> "كتب"
+    root: Mapped[str | None] = mapped_column(String(32, collation="C"), nullable=True)
+
+    __table_args__ = (
+        # Keyset pages of /api/words, unfiltered and by root
+        Index("ix_dictionary_words_browse", "normalized_word", "id"),
+        Index("ix_dictionary_words_root_browse", "root", "normalized_word", "id"),
+    )
 
 class DailyOverride(Base):
     """
@@ -47,6 +71,17 @@ class DailyOverride(Base):
     dictionary_word_id: Mapped[int] = mapped_column(ForeignKey("dictionary_words.id"))
     word = relationship("DictionaryWord")
 
+class DailySchedule(Base):
+    """
+    Materialized daily rotation: one row per Riyadh day since the schedule epoch.
+    Extended ahead of time by services/schedule.py; overrides are merged at lookup.
+    """
+    __tablename__ = "daily_schedule"
+    day: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)  # days since epoch
+    date_key: Mapped[str] = mapped_column(String(10), unique=True)                   # YYYY-MM-DD (Riyadh)
+    cycle: Mapped[int] = mapped_column(Integer)                                      # rotation pass number
+    dictionary_word_id: Mapped[int] = mapped_column(ForeignKey("dictionary_words.id"))
+
 class BattlePass(Base):
     __tablename__ = "battle_pass"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -64,5 +99,67 @@ class UserBattlePass(Base):
     season: Mapped[str] = mapped_column(String(32))
     current_level: Mapped[int] = mapped_column(Integer, default=1)
     current_xp: Mapped[int] = mapped_column(Integer, default=0)
+    # Change watermark for incremental exports: the DB's clock (UTC), stamped on every insert/update
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.timezone("UTC", func.now()), onupdate=func.timezone("UTC", func.now()), index=True
+    )
 
     user = relationship("User", back_populates="battle_pass")
+
+    __table_args__ = (Index("ix_user_battle_pass_season_xp", "season", "current_xp"),)
+
+class Season(Base):
+    """Battle-pass seasons; the one without ended_at is active (see battlepass.active_season)."""
+    __tablename__ = "seasons"
+    code: Mapped[str] = mapped_column(String(32), primary_key=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    ended_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+class UserBattlePassHistory(Base):
+    """A user's final progress in a finished season, archived by the season rollover."""
+    __tablename__ = "user_battle_pass_history"
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    season: Mapped[str] = mapped_column(String(32), primary_key=True)
+    current_level: Mapped[int] = mapped_column(Integer)
+    current_xp: Mapped[int] = mapped_column(Integer)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+class SeasonRollover(Base):
+    """State of a rollover run (services/seasons.py), so an interrupted one resumes where it stopped."""
+    __tablename__ = "season_rollovers"
+    to_season: Mapped[str] = mapped_column(String(32), primary_key=True)
+    from_season: Mapped[str] = mapped_column(String(32))
+    mode: Mapped[str] = mapped_column(String(16))                      # "reset" or "carry"
+    carry_percent: Mapped[int] = mapped_column(Integer, default=0)    # share of xp kept in "carry" mode
+    last_user_id: Mapped[int] = mapped_column(Integer, default=0)     # keyset cursor over user_battle_pass
+    rows_done: Mapped[int] = mapped_column(Integer, default=0)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+class GameResult(Base):
+    """One finished daily puzzle per user per Riyadh day (written in batches by services/game_results.py)."""
+    __tablename__ = "game_results"
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    date_key: Mapped[str] = mapped_column(String(10))              # YYYY-MM-DD (Riyadh)
+    guesses: Mapped[int] = mapped_column(Integer)
+    won: Mapped[bool] = mapped_column(Boolean)
+    xp_awarded: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.timezone("UTC", func.now()))
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "date_key", name="uix_game_results_user_date"),
+        Index("ix_game_results_created_at", "created_at"),  # incremental exports
+    )
+
+class UserStats(Base):
+    """Running totals per user, updated with each batch of game results."""
+    __tablename__ = "user_stats"
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    games_played: Mapped[int] = mapped_column(Integer, default=0)
+    wins: Mapped[int] = mapped_column(Integer, default=0)
+    current_streak: Mapped[int] = mapped_column(Integer, default=0)  # consecutive days won
+    max_streak: Mapped[int] = mapped_column(Integer, default=0)
+    last_day: Mapped[int | None] = mapped_column(Integer, nullable=True)  # schedule day index of the latest result
+    guess_hist: Mapped[list | None] = mapped_column(JSON, nullable=True)  # wins by guess count: [1 guess, 2, ...]
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
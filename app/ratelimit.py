@@ -0,0 +1,88 @@
+import math
+from collections import OrderedDict
+from time import monotonic
+from starlette.requests import Request
+from .config import settings
+
+class RateLimited(Exception):
+    """Raised when a bucket is empty; mapped to 429 + Retry-After in main.py."""
+
+    def __init__(self, limiter: str, retry_after: float):
+        super().__init__(limiter)
+        self.limiter = limiter
+        self.retry_after = retry_after
+
+    def header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+class TokenBucketLimiter:
+    """
+    One token bucket per key (refilling per_minute / 60 tokens a second, up to burst).
+    Buckets are (tokens, stamp) pairs under the key's hash, in LRU order: once max_keys
+    are tracked the least recently seen is dropped, so memory stays bounded.
+    In-process only; take() is the seam for a shared backend later.
+    """
+
+    def __init__(self, name: str, per_minute: float, burst: int, max_keys: int, enabled: bool = True):
+        self.name = name
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        self.enabled = enabled
+        self._buckets: OrderedDict[int, tuple[float, float]] = OrderedDict()
+        # metrics
+        self.allowed = 0
+        self.limited = 0
+        self.evicted = 0
+
+    def take(self, key: str, now: float | None = None) -> float:
+        """Spend one token; returns 0 when allowed, else seconds until a token is back."""
+        now = monotonic() if now is None else now
+        k = hash(key)
+        bucket = self._buckets.get(k)
+        if bucket is None:
+            tokens = float(self.burst)
+            if len(self._buckets) >= self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evicted += 1
+        else:
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            self._buckets.move_to_end(k)
+        if tokens >= 1:
+            self._buckets[k] = (tokens - 1, now)
+            self.allowed += 1
+            return 0.0
+        self._buckets[k] = (tokens, now)
+        self.limited += 1
+        return (1 - tokens) / self.rate
+
+    def check(self, key: str) -> None:
+        if not self.enabled:
+            return
+        retry_after = self.take(key)
+        if retry_after:
+            raise RateLimited(self.name, retry_after)
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "allowed": self.allowed, "limited": self.limited, "evicted": self.evicted}
+
+def client_ip(request: Request) -> str:
+    # Each trusted proxy appends the address it saw; anything further left is client-supplied
+    hops = settings.RATE_LIMIT_PROXY_HOPS
+    if hops > 0:
+        forwarded = [h.strip() for h in ",".join(request.headers.getlist("x-forwarded-for")).split(",") if h.strip()]
+        if forwarded:
+            return forwarded[-min(hops, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+def _limiter(name: str, per_minute: float, burst: int) -> TokenBucketLimiter:
+    return TokenBucketLimiter(name, per_minute, burst, settings.RATE_LIMIT_MAX_KEYS, settings.RATE_LIMIT_ENABLED)
+
+# Checked before any bcrypt work is queued
+login_ip = _limiter("login_ip", settings.LOGIN_RATE_IP_PER_MINUTE, settings.LOGIN_RATE_IP_BURST)
+login_email = _limiter("login_email", settings.LOGIN_RATE_EMAIL_PER_MINUTE, settings.LOGIN_RATE_EMAIL_BURST)
+register_ip = _limiter("register_ip", settings.REGISTER_RATE_IP_PER_MINUTE, settings.REGISTER_RATE_IP_BURST)
+LIMITERS = (login_ip, login_email, register_ip)
+
+def stats() -> dict:
+    return {l.name: l.stats() for l in LIMITERS}
@@ -0,0 +1,52 @@
+"""
+Battle-pass season rollover, against DATABASE_URL.
+
+    python -m app.rollover S2                                 # reset everyone to level 1
+    python -m app.rollover S2 --mode carry --carry-percent 10 # keep 10% of each player's xp
+    python -m app.rollover S2 --chunk-size 2000 --pause-ms 50 # gentler on live traffic
+
+The new season gets the old season's tiers unless battle_pass already has rows for it,
+and becomes active immediately. Old progress is archived to user_battle_pass_history
+and moved over in keyset chunks, one short transaction each. Re-running the same
+command resumes an interrupted rollover.
+"""
+import argparse
+import asyncio
+from sqlalchemy import func, select
+from .db import engine, AsyncSessionLocal
+from .services.seasons import ROLLOVER_LOCK_ID, MODES, RolloverError, rollover
+
+async def run(args) -> int:
+    try:
+        # Session-level lock on its own connection; the work commits chunk by chunk on others
+        async with engine.connect() as lock_conn:
+            if not (await lock_conn.execute(select(func.pg_try_advisory_lock(ROLLOVER_LOCK_ID)))).scalar():
+                print("⚠ Another rollover is running")
+                return 1
+            await lock_conn.commit()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await rollover(db, args.season, args.from_season, args.mode, args.carry_percent,
+                                   args.chunk_size, args.pause_ms / 1000)
+            except RolloverError as e:
+                print(f"⚠ {e}")
+                return 1
+            finally:
+                await lock_conn.execute(select(func.pg_advisory_unlock(ROLLOVER_LOCK_ID)))
+                await lock_conn.commit()
+        return 0
+    finally:
+        await engine.dispose()
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("season", help="New season code, e.g. S2")
+    p.add_argument("--from", dest="from_season", help="Season to roll from (default: the active one)")
+    p.add_argument("--mode", choices=MODES, default="reset")
+    p.add_argument("--carry-percent", type=int, default=0, help="Share of xp kept with --mode carry")
+    p.add_argument("--chunk-size", type=int, default=5000)
+    p.add_argument("--pause-ms", type=float, default=0, help="Sleep between chunks")
+    raise SystemExit(asyncio.run(run(p.parse_args())))
+
+if __name__ == "__main__":
+    main()
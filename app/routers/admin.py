@@ -0,0 +1,96 @@
+from datetime import date as Date, datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy import select, delete, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db import get_session
+from ..deps import admin_user
+from ..models import DailyOverride, DictionaryWord, Team
+from ..services import export, invalidation, team_stats
+from ..services.arabic import normalize
+from ..services.teams import registry
+from ..services.words import invalidate_daily
+from ..schemas import DailyOverrideIn, DailyWordOut, TeamIn, TeamOut
+
+# Write paths for data the read side serves from pre-encoded caches; each drops the cache it touches
+# here and publishes the same invalidation to the other workers on commit
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(admin_user)])
+
+def _date_key(value: str) -> str:
+    try:
+        return Date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise HTTPException(400, "Date must be YYYY-MM-DD")
+
+@router.put("/daily/{date_key}", response_model=DailyWordOut)
+async def set_daily_override(date_key: str, data: DailyOverrideIn, db: AsyncSession = Depends(get_session)):
+    key = _date_key(date_key)
+    res = await db.execute(select(DictionaryWord).where(DictionaryWord.normalized_word == normalize(data.word)))
+    word = res.scalar_one_or_none()
+    if word is None:
+        raise HTTPException(404, "Word not in dictionary")
+    stmt = pg_insert(DailyOverride).values(date_key=key, dictionary_word_id=word.id)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[DailyOverride.date_key], set_={"dictionary_word_id": stmt.excluded.dictionary_word_id}
+    ))
+    await invalidation.publish(db, "daily", key)
+    await db.commit()
+    invalidate_daily(key)
+    return DailyWordOut(date=key, index=-1, word=word.word, definition=word.definition)
+
+@router.delete("/daily/{date_key}")
+async def clear_daily_override(date_key: str, db: AsyncSession = Depends(get_session)):
+    key = _date_key(date_key)
+    res = await db.execute(delete(DailyOverride).where(DailyOverride.date_key == key))
+    await invalidation.publish(db, "daily", key)
+    await db.commit()
+    invalidate_daily(key)
+    return {"ok": True, "removed": res.rowcount}
+
+@router.post("/teams", response_model=TeamOut)
+async def create_team(data: TeamIn, db: AsyncSession = Depends(get_session)):
+    await registry.ensure_loaded(db)
+    if data.code in registry.by_code:
+        raise HTTPException(400, "Team code already exists")
+    db.add(Team(code=data.code, name=data.name))
+    await invalidation.publish(db, "teams")
+    await db.commit()
+    await registry.refresh(db)
+    # Give the new team its (empty) leaderboard row
+    await team_stats.reconcile(db)
+    return TeamOut(code=data.code, name=data.name)
+
+@router.patch("/teams/{team_code}", response_model=TeamOut)
+async def rename_team(team_code: str, data: TeamIn, db: AsyncSession = Depends(get_session)):
+    await registry.ensure_loaded(db)
+    if data.code != team_code and data.code in registry.by_code:
+        raise HTTPException(400, "Team code already exists")
+    res = await db.execute(update(Team).where(Team.code == team_code).values(code=data.code, name=data.name))
+    if not res.rowcount:
+        raise HTTPException(404, "Unknown team")
+    await invalidation.publish(db, "teams")
+    await db.commit()
+    await registry.refresh(db)
+    return TeamOut(code=data.code, name=data.name)
+
+@router.get("/export/{dataset}")
+async def export_data(dataset: str, format: str = Query(default="ndjson"), since: datetime | None = Query(default=None)):
+    """Stream a dataset (users, progress or results) as NDJSON or CSV; see services/export.py."""
+    if dataset not in export.DATASETS:
+        raise HTTPException(404, f"Unknown dataset; one of {', '.join(export.DATASETS)}")
+    if format not in export.FORMATS:
+        raise HTTPException(400, f"Format must be one of {', '.join(export.FORMATS)}")
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    try:
+        watermark, body = await export.open_export(dataset, format, since)
+    except export.ExportBusy:
+        raise HTTPException(429, "Too many exports running, try again later", headers={"Retry-After": "10"})
+    filename = f"{dataset}-{watermark:%Y%m%dT%H%M%S}.{'csv' if format == 'csv' else 'ndjson'}"
+    # Runs after a disconnect too, when Starlette drops the body iterator mid-stream
+    return StreamingResponse(body, media_type=export.FORMATS[format], background=BackgroundTask(export.close, body), headers={
+        "X-Export-Watermark": watermark.isoformat(),
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    })
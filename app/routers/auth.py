@@ -1,52 +1,56 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from authlib.integrations.starlette_client import OAuth
 from starlette.responses import RedirectResponse
 from ..schemas import RegisterIn, TokenOut, GoogleAuthStartOut
-from ..models import User, Team
-from ..security import hash_password, verify_password, create_access_token
+from ..models import User
+from ..security import (hash_password_async, verify_password_async, needs_rehash,
+                        create_access_token, PasswordPoolBusy)
 from ..config import settings
-from ..db import get_session
+from .. import ratelimit
+from ..db import get_session, replica
+from ..services.identity import invalidate_user
+from ..services import invalidation, oidc
+from ..services.oidc import OIDCError
+from ..services.teams import registry as team_registry
+from ..services import team_stats
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 # --- Email/password ---
 @router.post("/register", response_model=TokenOut)
-async def register(data: RegisterIn, db: AsyncSession = Depends(get_session)):
+async def register(data: RegisterIn, request: Request, db: AsyncSession = Depends(get_session)):
+    # Repeat emails are rejected before hashing, so only the client IP is limited here
+    ratelimit.register_ip.check(ratelimit.client_ip(request))
     try:
         # team_code optional on register; can be set later
         exists = await db.execute(select(User).where(User.email == data.email))
         if exists.scalar_one_or_none():
             raise HTTPException(400, "Email already registered")
-        team_id = None
+        await team_registry.ensure_loaded(db)
         if data.team_code:
-            t = await db.execute(select(Team).where(Team.code == data.team_code))
-            team = t.scalar_one_or_none()
+            team = team_registry.by_code.get(data.team_code)
             if not team:
                 raise HTTPException(400, "Invalid team code")
             team_id = team.id
         else:
-            # auto-assign a random team
-            teams_result = await db.execute(select(Team))
-            teams = teams_result.scalars().all()
-            if teams:
-                import random
-                team_id = random.choice(teams).id
-            # If no teams exist, team_id stays None (nullable field)
+            # auto-assign the least-populated team (None if no teams exist)
+            team_id = team_registry.pick_team_id()
 
         user = User(
             email=data.email,
-            hashed_password=hash_password(data.password),
+            hashed_password=await hash_password_async(data.password),
             display_name=data.display_name,
             team_id=team_id
         )
         db.add(user)
+        await team_stats.move_member(db, None, team_id)
         await db.commit()
         await db.refresh(user)
+        replica.mark_written(user.id)
         token = create_access_token(str(user.id))
         return TokenOut(access_token=token)
-    except HTTPException:
+    except (HTTPException, PasswordPoolBusy):
         raise
     except Exception as e:
         import traceback
@@ -72,40 +76,50 @@ async def login(request: Request, db: AsyncSession = Depends(get_session)):
         pass
     if not email or not password:
         raise HTTPException(422, "Missing credentials")
+    # Throttle before the user lookup and bcrypt: per client, then per targeted account
+    ratelimit.login_ip.check(ratelimit.client_ip(request))
+    ratelimit.login_email.check(email.strip().lower())
 
     q = await db.execute(select(User).where(User.email == email))
     user = q.scalar_one_or_none()
-    if not user or not user.hashed_password or not verify_password(password, user.hashed_password):
+    if not user or not user.hashed_password or not await verify_password_async(password, user.hashed_password):
         raise HTTPException(400, "Incorrect email or password")
+    if needs_rehash(user.hashed_password):
+        # Cost factor changed since this hash was made; upgrade it while we have the plaintext
+        try:
+            user.hashed_password = await hash_password_async(password)
+            await db.commit()
+        except PasswordPoolBusy:
+            pass
     token = create_access_token(str(user.id))
     return TokenOut(access_token=token)
 
 # --- Google OAuth ---
-oauth = OAuth()
-oauth.register(
-    name="google",
-    client_id=settings.GOOGLE_CLIENT_ID,
-    client_secret=settings.GOOGLE_CLIENT_SECRET,
-    server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
-    client_kwargs={"scope": "openid email profile"},
-)
-
+# Discovery/JWKS are cached and all provider calls share one pooled client (services/oidc.py)
 @router.get("/google/start", response_model=GoogleAuthStartOut)
 async def google_start(request: Request):
     redirect_uri = settings.OAUTH_REDIRECT_URI
     # We return the URL for Godot to open in a webview or external browser
-    conf = await oauth.google.load_server_metadata()
-    client = oauth.create_client("google")
-    uri, _state = client.create_authorization_url(conf["authorization_endpoint"], redirect_uri=redirect_uri)
+    try:
+        uri = await oidc.google.authorization_url(redirect_uri)
+    except OIDCError as e:
+        print(f"⚠ Google sign-in start failed: {e}")
+        raise HTTPException(502, "Google sign-in unavailable")
     return GoogleAuthStartOut(authorization_url=uri)
 
 @router.get("/google/callback")
 async def google_callback(request: Request, db: AsyncSession = Depends(get_session)):
-    token = await oauth.google.authorize_access_token(request)
-    userinfo = token.get("userinfo")
-    if not userinfo:
-        # fallback: fetch
-        userinfo = await oauth.google.parse_id_token(request, token)
+    code = request.query_params.get("code")
+    state = request.query_params.get("state")
+    if not code or not state:
+        raise HTTPException(400, request.query_params.get("error") or "Missing code or state")
+    try:
+        userinfo = await oidc.google.complete(code, state, settings.OAUTH_REDIRECT_URI)
+    except OIDCError as e:
+        print(f"⚠ Google sign-in failed: {e}")
+        raise HTTPException(400, "Google sign-in failed")
+    if not userinfo.get("email"):
+        raise HTTPException(400, "Google account has no email")
 
     email = userinfo["email"]
     sub = userinfo["sub"]
@@ -122,16 +136,18 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_sessi
             if not user.display_name:
                 user.display_name = display_name
         else:
-            # auto-assign team on first OAuth sign-in
-            team_id = None
-            teams = (await db.execute(select(Team))).scalars().all()
-            if teams:
-                import random
-                team_id = random.choice(teams).id
+            # auto-assign the least-populated team on first OAuth sign-in
+            await team_registry.ensure_loaded(db)
+            team_id = team_registry.pick_team_id()
             user = User(email=email, hashed_password=None, google_sub=sub, display_name=display_name, team_id=team_id)
             db.add(user)
+            await team_stats.move_member(db, None, team_id)
+        await db.flush()
+        await invalidation.publish(db, "user", user.id)
         await db.commit()
         await db.refresh(user)
+        invalidate_user(user.id)
+        replica.mark_written(user.id)
 
     jwt_token = create_access_token(str(user.id))
     # You can redirect back to your game custom URL scheme, or show a small page that prints the token.
@@ -1,34 +1,61 @@
-from fastapi import APIRouter, Header, HTTPException, Depends
-from jose import jwt as jose_jwt
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..db import get_session
+from ..db import get_session, get_read_session
+from ..deps import current_user_id
 from ..config import settings
-from ..services.battlepass import get_progress, add_xp
-from ..schemas import BattlePassProgressOut
+from ..models import User, Team, UserBattlePass
+from ..services import leaderboard
+from ..services.battlepass import active_season, get_tiers
+from ..services.http_cache import respond
+from ..services.xp_buffer import get_progress, add_xp
+from ..schemas import BattlePassProgressOut, LeaderboardOut, LeaderboardEntryOut, LeaderboardRankOut, TiersOut
 
 router = APIRouter(prefix="/battlepass", tags=["battlepass"])
 
-def user_id_from_header(authorization: str | None) -> int:
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(401, "Missing token")
-    token = authorization.split(" ", 1)[1]
-    payload = jose_jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
-    return int(payload["sub"])
-
 @router.get("/me", response_model=BattlePassProgressOut)
-async def my_progress(authorization: str | None = Header(None), db: AsyncSession = Depends(get_session)):
-    uid = user_id_from_header(authorization)
-    prog, next_xp = await get_progress(db, uid)
-    return BattlePassProgressOut(season=prog.season, current_level=prog.current_level, current_xp=prog.current_xp, next_level_xp=next_xp)
+async def my_progress(uid: int = Depends(current_user_id), db: AsyncSession = Depends(get_read_session)):
+    prog = await get_progress(db, uid)
+    return BattlePassProgressOut(**prog._asdict())
+
+@router.get("/tiers", response_model=TiersOut)
+async def season_tiers(request: Request, season: str | None = Query(default=None),
+                       db: AsyncSession = Depends(get_read_session)):
+    tiers = await get_tiers(db, season or await active_season(db))
+    return respond(request, tiers.body)
 
 @router.post("/add_xp/{amount}", response_model=BattlePassProgressOut)
-async def gain_xp(amount: int, authorization: str | None = Header(None), db: AsyncSession = Depends(get_session)):
-    uid = user_id_from_header(authorization)
+async def gain_xp(amount: int, uid: int = Depends(current_user_id), db: AsyncSession = Depends(get_session)):
     prog = await add_xp(db, uid, amount)
-    # compute next level req
-    from sqlalchemy import select
-    from ..models import BattlePass
-    q = await db.execute(select(BattlePass).where(BattlePass.season==prog.season, BattlePass.level==prog.current_level+1))
-    next_bp = q.scalar_one_or_none()
-    next_xp = next_bp.xp_required if next_bp else 0
-    return BattlePassProgressOut(season=prog.season, current_level=prog.current_level, current_xp=prog.current_xp, next_level_xp=next_xp)
+    return BattlePassProgressOut(**prog._asdict())
+
+@router.get("/leaderboard", response_model=LeaderboardOut)
+async def season_leaderboard(season: str | None = Query(default=None),
+                             limit: int = Query(default=50, ge=1),
+                             offset: int = Query(default=0, ge=0),
+                             db: AsyncSession = Depends(get_read_session)):
+    season = season or await active_season(db)
+    limit = min(limit, settings.LEADERBOARD_PAGE_MAX)
+    ranking = await leaderboard.get_ranking(db, season)
+    # Walks ix_user_battle_pass_season_xp backwards
+    res = await db.execute(
+        select(UserBattlePass.user_id, UserBattlePass.current_level, UserBattlePass.current_xp, User.display_name, Team.code)
+        .join(User, User.id == UserBattlePass.user_id)
+        .outerjoin(Team, Team.id == User.team_id)
+        .where(UserBattlePass.season == season)
+        .order_by(UserBattlePass.current_xp.desc(), UserBattlePass.user_id)
+        .limit(limit).offset(offset)
+    )
+    entries = [
+        LeaderboardEntryOut(rank=ranking.rank(xp), user_id=uid, display_name=name, team_code=code,
+                            current_level=level, current_xp=xp)
+        for uid, level, xp, name, code in res.all()
+    ]
+    return LeaderboardOut(season=season, total=ranking.total, offset=offset, entries=entries)
+
+@router.get("/leaderboard/me", response_model=LeaderboardRankOut)
+async def my_rank(uid: int = Depends(current_user_id), db: AsyncSession = Depends(get_read_session)):
+    prog = await get_progress(db, uid)
+    ranking = await leaderboard.get_ranking(db, prog.season)
+    xp = ranking.xp.get(uid, prog.current_xp)
+    return LeaderboardRankOut(season=prog.season, rank=ranking.rank(xp), total=ranking.total, current_xp=xp)
@@ -1,22 +1,95 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from datetime import date as Date
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..db import get_session
-from ..services.words import get_daily_word
-from ..schemas import DailyWordOut
+from ..db import get_read_session
+from ..deps import current_user_id, date_key, riyadh_today
+from fastapi.responses import Response, StreamingResponse
+from ..config import settings
+from ..services.words import daily_body, daily_bodies, daily_answer, get_index
+from ..services.scoring import letters, CORRECT
+from ..services import game_results
+from ..services.http_cache import respond, combined_etag, cache_headers, not_modified
+from ..schemas import DailyWordOut, DailyGuessIn, DailyGuessOut, GuessResultOut, GameResultIn, GameResultOut
 
 router = APIRouter(prefix="/daily", tags=["daily"])
 
+def _parse_date(value: str) -> Date:
+    y, m, d = map(int, value.split("-"))
+    return Date(y, m, d)
+
 @router.get("", response_model=DailyWordOut)
-async def daily_word(date: str | None = Query(default=None, description="YYYY-MM-DD (Riyadh)"),
-                     db: AsyncSession = Depends(get_session)):
-    d: Date | None = None
-    if date:
-        y, m, d_ = map(int, date.split("-"))
-        from datetime import date as dtdate
-        d = dtdate(y, m, d_)
-    date_str, idx, word_obj = await get_daily_word(db, for_date=d)
-    if isinstance(word_obj, dict):
-        return DailyWordOut(date=date_str, index=idx, word=word_obj["word"], definition=word_obj["definition"])
-    else:
-        return DailyWordOut(date=date_str, index=idx, word=word_obj.word, definition=word_obj.definition)
+async def daily_word(request: Request,
+                     date: str | None = Query(default=None, description="YYYY-MM-DD (Riyadh)"),
+                     db: AsyncSession = Depends(get_read_session)):
+    try:
+        d = _parse_date(date) if date else None
+        cached = await daily_body(db, for_date=d)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    # Same bytes for every player all day: ETag + cacheable until Riyadh midnight
+    return respond(request, cached)
+
+@router.get("/range", response_model=list[DailyWordOut])
+async def daily_range(request: Request,
+                      start: str = Query(alias="from", description="YYYY-MM-DD (Riyadh), inclusive"),
+                      end: str = Query(alias="to", description="YYYY-MM-DD (Riyadh), inclusive"),
+                      db: AsyncSession = Depends(get_read_session)):
+    try:
+        first, last = _parse_date(start), _parse_date(end)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if last < first:
+        raise HTTPException(400, "'to' is before 'from'")
+    if (last - first).days + 1 > settings.DAILY_RANGE_MAX_DAYS:
+        raise HTTPException(400, f"At most {settings.DAILY_RANGE_MAX_DAYS} days per request")
+    try:
+        parts = await daily_bodies(db, first, last)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    etag = combined_etag(parts)
+    headers = cache_headers(etag)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    async def body():
+        # The per-day bodies are already encoded; only the brackets and commas are new
+        yield b"["
+        for i, part in enumerate(parts):
+            yield b"," + part.body if i else part.body
+        yield b"]"
+
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
+
+@router.post("/guess", response_model=DailyGuessOut)
+async def score_guesses(data: DailyGuessIn, db: AsyncSession = Depends(get_read_session)):
+    if len(data.guesses) > settings.DAILY_GUESS_MAX_BATCH:
+        raise HTTPException(400, f"At most {settings.DAILY_GUESS_MAX_BATCH} guesses per request")
+    try:
+        date_str, answer = await daily_answer(db, _parse_date(data.date) if data.date else None)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    index = await get_index(db)
+    keys = [letters(g) for g in data.guesses]
+    solved = [CORRECT] * answer.length
+    results = [
+        GuessResultOut(guess=guess, valid=marks is not None and key in index, marks=marks, solved=marks == solved)
+        for guess, key, marks in zip(data.guesses, keys, answer.score_many(keys))
+    ]
+    return DailyGuessOut(date=date_str, length=answer.length, results=results)
+
+@router.post("/result", response_model=GameResultOut, status_code=202)
+async def submit_result(data: GameResultIn, user_id: int = Depends(current_user_id)):
+    if not 1 <= data.guesses <= settings.GAME_MAX_GUESSES:
+        raise HTTPException(400, f"guesses must be between 1 and {settings.GAME_MAX_GUESSES}")
+    today = riyadh_today()
+    try:
+        d = _parse_date(data.date) if data.date else today
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    # Yesterday stays open for games finished just after Riyadh midnight
+    if not 0 <= (today - d).days <= 1:
+        raise HTTPException(400, "Results are accepted for today and yesterday only")
+    key = date_key(d)
+    # Written off the request path: result, stats and XP land together in the next batch
+    game_results.buffer.add(game_results.PendingResult(user_id, key, data.guesses, data.won))
+    return GameResultOut(date=key, xp=game_results.xp_for(data.guesses, data.won))
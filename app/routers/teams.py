@@ -1,33 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..db import get_session
-from ..models import Team, User
-from ..schemas import TeamOut
+from ..db import get_session, get_read_session
+from ..deps import current_user_id
+from ..services.identity import invalidate_user
+from ..services.teams import registry, set_user_team
+from ..services import invalidation, team_stats
+from ..services.http_cache import respond
+from ..schemas import TeamOut, TeamLeaderboardOut
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
 @router.get("", response_model=list[TeamOut])
-async def list_teams(db: AsyncSession = Depends(get_session)):
-    res = await db.execute(select(Team))
-    return [TeamOut(code=t.code, name=t.name) for t in res.scalars().all()]
+async def list_teams(request: Request, db: AsyncSession = Depends(get_read_session)):
+    await registry.ensure_loaded(db)
+    return respond(request, registry.list_body)
+
+@router.get("/leaderboard", response_model=list[TeamLeaderboardOut])
+async def team_leaderboard(db: AsyncSession = Depends(get_read_session)):
+    await registry.ensure_loaded(db)
+    stats = team_stats.snapshot()
+    if not stats:
+        await team_stats.refresh_snapshot(db)
+    out = []
+    for team_id, (total_xp, member_count, level_sum) in stats.items():
+        team = registry.by_id.get(team_id)
+        if team is None:
+            continue
+        avg_level = round(level_sum / member_count, 2) if member_count else 0.0
+        out.append(TeamLeaderboardOut(code=team.code, name=team.name, total_xp=total_xp,
+                                      member_count=member_count, avg_level=avg_level))
+    out.sort(key=lambda t: (-t.total_xp, t.code))
+    return out
 
 @router.post("/choose/{team_code}")
 async def choose_team(team_code: str,
-                      authorization: str | None = Header(None),
+                      user_id: int = Depends(current_user_id),
                       db: AsyncSession = Depends(get_session)):
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(401, "Missing token")
-    token = authorization.split(" ", 1)[1]
-    from jose import jwt as jose_jwt
-    from ..config import settings
-    payload = jose_jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
-    user_id = int(payload["sub"])
-
-    team = (await db.execute(select(Team).where(Team.code == team_code))).scalar_one_or_none()
+    await registry.ensure_loaded(db)
+    team = registry.by_code.get(team_code)
     if not team:
         raise HTTPException(400, "Invalid team code")
-    user = await db.get(User, user_id)
-    user.team_id = team.id
+    found, _old_team_id = await set_user_team(db, user_id, team.id)
+    if not found:
+        raise HTTPException(401, "Unknown user")
+    invalidate_user(user_id)
+    # Other workers hold this profile (with its team) for up to AUTH_PROFILE_TTL_SECONDS
+    await invalidation.publish(db, "user", user_id)
     await db.commit()
     return {"ok": True, "team_code": team.code}
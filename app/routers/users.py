@@ -1,23 +1,26 @@
-from fastapi import APIRouter, Header, HTTPException, Depends
-from jose import jwt as jose_jwt
-from sqlalchemy import select
+from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..db import get_session
 from ..config import settings
-from ..models import User, Team
-from ..schemas import UserOut
+from ..db import get_read_session
+from ..deps import current_user, current_user_id, riyadh_today
+from ..models import UserStats
+from ..services.schedule import day_index
+from ..services.identity import CurrentUser
+from ..schemas import UserOut, UserStatsOut
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.get("/me", response_model=UserOut)
-async def me(authorization: str | None = Header(None), db: AsyncSession = Depends(get_session)):
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(401, "Missing token")
-    token = authorization.split(" ", 1)[1]
-    payload = jose_jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
-    user = await db.get(User, int(payload["sub"]))
-    team_code = None
-    if user.team_id:
-        t = await db.get(Team, user.team_id)
-        team_code = t.code
-    return UserOut(id=user.id, email=user.email, display_name=user.display_name, team_code=team_code)
+async def me(user: CurrentUser = Depends(current_user)):
+    return UserOut(id=user.id, email=user.email, display_name=user.display_name, team_code=user.team_code)
+
+@router.get("/me/stats", response_model=UserStatsOut)
+async def my_stats(user_id: int = Depends(current_user_id), db: AsyncSession = Depends(get_read_session)):
+    stats = await db.get(UserStats, user_id)
+    if stats is None:
+        return UserStatsOut(games_played=0, wins=0, current_streak=0, max_streak=0,
+                            guess_hist=[0] * settings.GAME_MAX_GUESSES)
+    # The stored streak is as of the last result; a missed day since then has broken it
+    streak = stats.current_streak if stats.last_day is not None and stats.last_day >= day_index(riyadh_today()) - 1 else 0
+    return UserStatsOut(games_played=stats.games_played, wins=stats.wins, current_streak=streak,
+                        max_streak=stats.max_streak, guess_hist=stats.guess_hist or [0] * settings.GAME_MAX_GUESSES)
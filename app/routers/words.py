@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db import get_read_session
+from ..config import settings
+from ..services.arabic import normalize, normalize_root
+from ..services.words import browse, decode_cursor, encode_cursor, get_index
+from ..schemas import WordOut, WordsPageOut, WordsValidateIn, WordsValidateOut, WordValidationOut
+
+router = APIRouter(prefix="/words", tags=["words"])
+
+@router.get("", response_model=WordsPageOut)
+async def list_words(prefix: str | None = Query(default=None), root: str | None = Query(default=None),
+                     cursor: str | None = Query(default=None), limit: int = Query(default=50, ge=1),
+                     db: AsyncSession = Depends(get_read_session)):
+    """Dictionary in normalized order; prefix= and root= accept any spelling (diacritics, hamza forms,
+    "ك-ت-ب"). Follow next_cursor for the next page."""
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    rows, next_key = await browse(db, normalize(prefix or ""), normalize_root(root), after,
+                                  min(limit, settings.WORDS_PAGE_MAX))
+    items = [
+        WordOut(id=r.id, word=r.word, normalized=r.normalized_word, root=r.root, definition=r.definition, meta=r.meta)
+        for r in rows
+    ]
+    return WordsPageOut(items=items, next_cursor=encode_cursor(*next_key) if next_key else None)
+
+@router.post("/validate", response_model=WordsValidateOut)
+async def validate_words(data: WordsValidateIn, db: AsyncSession = Depends(get_read_session)):
+    if len(data.words) > settings.WORDS_VALIDATE_MAX_BATCH:
+        raise HTTPException(400, f"At most {settings.WORDS_VALIDATE_MAX_BATCH} words per request")
+    index = await get_index(db)
+    results = []
+    for word in data.words:
+        key = normalize(word)
+        results.append(WordValidationOut(word=word, normalized=key, valid=key in index))
+    return WordsValidateOut(results=results)
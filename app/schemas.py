@@ -29,14 +29,111 @@ class TeamOut(BaseModel):
     code: str
     name: str
 
+class TeamIn(BaseModel):
+    code: str
+    name: str
+
+class DailyOverrideIn(BaseModel):
+    word: str
+
+class TeamLeaderboardOut(BaseModel):
+    code: str
+    name: str
+    total_xp: int
+    member_count: int
+    avg_level: float
+
 class DailyWordOut(BaseModel):
     date: str            # YYYY-MM-DD (Riyadh)
     index: int           # selected index
     word: str
     definition: str
 
+class DailyGuessIn(BaseModel):
+    guesses: list[str]
+    date: Optional[str] = None  # YYYY-MM-DD (Riyadh); today if omitted
+
+class GuessResultOut(BaseModel):
+    guess: str
+    valid: bool                  # right length and in the dictionary
+    marks: Optional[list[int]]   # per letter: 2 correct, 1 present, 0 absent; null on length mismatch
+    solved: bool
+
+class DailyGuessOut(BaseModel):
+    date: str
+    length: int
+    results: list[GuessResultOut]
+
+class GameResultIn(BaseModel):
+    guesses: int                # guesses used, 1..GAME_MAX_GUESSES
+    won: bool
+    date: Optional[str] = None  # YYYY-MM-DD (Riyadh); today if omitted, yesterday accepted
+
+class GameResultOut(BaseModel):
+    date: str
+    xp: int                     # awarded when the batch is written; repeats for a recorded day are ignored
+
+class UserStatsOut(BaseModel):
+    games_played: int
+    wins: int
+    current_streak: int
+    max_streak: int
+    guess_hist: list[int]       # wins by guess count: [1 guess, 2 guesses, ...]
+
+class WordsValidateIn(BaseModel):
+    words: list[str]
+
+class WordValidationOut(BaseModel):
+    word: str
+    normalized: str
+    valid: bool
+
+class WordsValidateOut(BaseModel):
+    results: list[WordValidationOut]
+
+class WordOut(BaseModel):
+    id: int
+    word: str
+    normalized: str
+    root: Optional[str] = None      # normalized root letters
+    definition: str
+    meta: Optional[dict] = None
+
+class WordsPageOut(BaseModel):
+    items: list[WordOut]
+    next_cursor: Optional[str] = None  # pass back as cursor= for the next page; None on the last one
+
+class TierOut(BaseModel):
+    level: int
+    xp_required: int
+    reward: Optional[dict] = None
+
+class TiersOut(BaseModel):
+    season: str
+    tiers: list[TierOut]
+
 class BattlePassProgressOut(BaseModel):
     season: str
     current_level: int
     current_xp: int
     next_level_xp: int
+
+class LeaderboardEntryOut(BaseModel):
+    rank: int
+    user_id: int
+    display_name: Optional[str] = None
+    team_code: Optional[str] = None
+    current_level: int
+    current_xp: int
+
+class LeaderboardOut(BaseModel):
+    season: str
+    total: int
+    offset: int
+    entries: list[LeaderboardEntryOut]
+
+class LeaderboardRankOut(BaseModel):
+    season: str
+    rank: int
+    total: int
+    current_xp: int
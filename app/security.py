@@ -1,4 +1,7 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
+from time import perf_counter
 from jose import jwt
 import bcrypt
 import hashlib
@@ -8,8 +11,8 @@ def hash_password(password: str) -> str:
     # Hash password with SHA256 first (produces 64 bytes hex string, always under 72-byte limit)
     # Then bcrypt the SHA256 hash to avoid any length issues
     sha256_hash = hashlib.sha256(password.encode('utf-8')).hexdigest()
-    # bcrypt.hashpw expects bytes, and rounds=12 is a good default
-    hashed = bcrypt.hashpw(sha256_hash.encode('utf-8'), bcrypt.gensalt(rounds=12))
+    # bcrypt.hashpw expects bytes; cost comes from BCRYPT_ROUNDS (12 by default)
+    hashed = bcrypt.hashpw(sha256_hash.encode('utf-8'), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS))
     return hashed.decode('utf-8')
 
 def verify_password(plain_password: str, hashed: str) -> bool:
@@ -18,6 +21,82 @@ def verify_password(plain_password: str, hashed: str) -> bool:
     # bcrypt.checkpw expects bytes
     return bcrypt.checkpw(sha256_hash.encode('utf-8'), hashed.encode('utf-8'))
 
+def needs_rehash(hashed: str) -> bool:
+    # bcrypt hashes look like $2b$12$<salt+hash>; the second field is the cost
+    try:
+        return int(hashed.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+class PasswordPoolBusy(Exception):
+    """Raised when the password pool already has workers + queue jobs in flight."""
+
+class PasswordPool:
+    """
+    Runs bcrypt off the event loop. Admission is bounded: once workers + queue jobs
+    are in flight, new work is rejected immediately instead of piling up.
+    """
+
+    def __init__(self, mode: str, workers: int, queue: int):
+        self.mode = mode
+        self.workers = workers
+        self.capacity = workers + queue
+        self._executor = None
+        self.in_flight = 0
+        # metrics
+        self.completed = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise PasswordPoolBusy()
+        self.in_flight += 1
+        t0 = perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            ms = (perf_counter() - t0) * 1000
+            self.completed += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_ms / self.completed, 3) if self.completed else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+password_pool = PasswordPool(settings.PASSWORD_POOL_MODE, settings.PASSWORD_POOL_WORKERS, settings.PASSWORD_POOL_QUEUE)
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed: str) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed)
+
 def create_access_token(sub: str) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     payload = {"sub": sub, "exp": expire}
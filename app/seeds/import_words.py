@@ -0,0 +1,28 @@
+"""
+Bulk dictionary import.
+
+    python -m app.seeds.import_words words.ndjson
+    python -m app.seeds.import_words words.csv --batch-size 10000 --update
+    python -m app.seeds.import_words words.json --dry-run
+
+Items need "word" and "definition"; "root" and "source" go into meta (the root also,
+normalized, into the root column searched by /api/words). Words are
+deduplicated on their normalized form (existing rows win unless --update).
+"""
+import argparse, asyncio
+from pathlib import Path
+from app.services.word_import import import_words
+
+def main():
+    p = argparse.ArgumentParser(description="Stream a JSON/NDJSON/CSV word list into dictionary_words")
+    p.add_argument("path", type=Path)
+    p.add_argument("--format", choices=["json", "ndjson", "jsonl", "csv"], default=None)
+    p.add_argument("--batch-size", type=int, default=5000)
+    p.add_argument("--update", action="store_true", help="overwrite definition/meta of existing words")
+    p.add_argument("--dry-run", action="store_true", help="parse and count without writing")
+    args = p.parse_args()
+    asyncio.run(import_words(args.path, fmt=args.format, batch_size=args.batch_size,
+                             update=args.update, dry_run=args.dry_run))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import unicodedata
+
+# Harakat, tanween, shadda, sukun, dagger alef, Quranic marks and tatweel are dropped
+_STRIP = [*range(0x0610, 0x061B), *range(0x064B, 0x0660), 0x0670, *range(0x06D6, 0x06EE), 0x0640]
+# Alef/hamza carriers, alef maqsura and ta marbuta collapse to one letter each
+_FOLD = {"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ؤ": "و", "ئ": "ي", "ى": "ي", "ة": "ه"}
+
+_TABLE = str.maketrans({**{chr(c): None for c in _STRIP}, **_FOLD})
+
+def normalize(word: str) -> str:
+    """Comparison key for Arabic words: presentation forms folded (NFKC), diacritics
+    stripped, alef/hamza/alef-maqsura/ta-marbuta unified."""
+    if not word:
+        return ""
+    if not word.isascii():
+        word = unicodedata.normalize("NFKC", word)
+    return word.translate(_TABLE).strip()
+
+def normalize_root(root: str | None) -> str:
+    """Root letters only, normalized: "ك-ت-ب", "ك ت ب" and "كتب" all give "كتب"."""
+    if not root:
+        return ""
+    return "".join(ch for ch in normalize(root) if ch.isalpha())
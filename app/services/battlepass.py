@@ -1,35 +1,150 @@
-from sqlalchemy import select
+from bisect import bisect_right
+from sqlalchemy import select, func, literal, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..models import BattlePass, UserBattlePass
+from ..models import BattlePass, Season, UserBattlePass
 from ..config import settings
+from ..db import on_primary, replica
+from . import team_stats, leaderboard
+from .http_cache import CachedBody, encode
+
+class TierTable:
+    """Sorted BattlePass tiers for one season."""
+    __slots__ = ("season", "xp_by_level", "thresholds", "body")
+
+    def __init__(self, season: str, tiers: list[tuple[int, int]], rewards: dict[int, dict | None] | None = None):
+        self.season = season
+        self.xp_by_level = dict(tiers)
+        rewards = rewards or {}
+        # Pre-encoded /api/battlepass/tiers response
+        self.body: CachedBody = encode({"season": season, "tiers": [
+            {"level": lvl, "xp_required": xp, "reward": rewards.get(lvl)} for lvl, xp in tiers
+        ]})
+        # Level L (>= 2) is reached once xp meets every requirement from 2..L; a gap in the
+        # level numbers stops progression. thresholds[i] is the running max for level i + 2.
+        self.thresholds: list[int] = []
+        running, level = 0, 2
+        while level in self.xp_by_level:
+            running = max(running, self.xp_by_level[level])
+            self.thresholds.append(running)
+            level += 1
+
+    def level_for_xp(self, xp: int) -> int:
+        return 1 + bisect_right(self.thresholds, xp)
+
+    def next_level_xp(self, level: int) -> int:
+        return self.xp_by_level.get(level + 1, 0)
+
+_TIERS: dict[str, TierTable] = {}
+# Active season code, from the seasons table (changed by the rollover, see services/seasons.py)
+_ACTIVE: str | None = None
+
+async def active_season(db: AsyncSession) -> str:
+    global _ACTIVE
+    if _ACTIVE is None:
+        code = (await db.execute(
+            select(Season.code).where(Season.ended_at.is_(None)).order_by(Season.started_at.desc()).limit(1)
+        )).scalar()
+        _ACTIVE = code or settings.BATTLEPASS_DEFAULT_SEASON
+    return _ACTIVE
+
+def current_season() -> str:
+    """Last known active season, for callers without a session (metrics)."""
+    return _ACTIVE or settings.BATTLEPASS_DEFAULT_SEASON
+
+def invalidate_active_season(_value=None) -> None:
+    global _ACTIVE
+    _ACTIVE = None
+
+async def get_tiers(db: AsyncSession, season: str) -> TierTable:
+    table = _TIERS.get(season)
+    if table is None:
+        res = await db.execute(
+            select(BattlePass.level, BattlePass.xp_required, BattlePass.reward)
+            .where(BattlePass.season == season).order_by(BattlePass.level)
+        )
+        rows = res.all()
+        table = TierTable(season, [(lvl, xp) for lvl, xp, _ in rows], {lvl: reward for lvl, _, reward in rows})
+        _TIERS[season] = table
+    return table
+
+def invalidate_tiers(season: str | None = None) -> None:
+    if season is None:
+        _TIERS.clear()
+    else:
+        _TIERS.pop(season, None)
 
 async def get_progress(db: AsyncSession, user_id: int):
     q = await db.execute(select(UserBattlePass).where(UserBattlePass.user_id == user_id))
     prog = q.scalar_one_or_none()
     if not prog:
-        prog = UserBattlePass(user_id=user_id, season=settings.BATTLEPASS_DEFAULT_SEASON, current_level=1, current_xp=0)
-        db.add(prog)
-        await db.commit()
-        await db.refresh(prog)
-    next_level = prog.current_level + 1
-    req_q = await db.execute(select(BattlePass).where(BattlePass.season==prog.season, BattlePass.level==next_level))
-    bp_next = req_q.scalar_one_or_none()
-    next_xp = bp_next.xp_required if bp_next else 0
-    return prog, next_xp
+        # First visit creates the row, on the primary even when reading from the replica
+        async with on_primary(db) as wdb:
+            prog = UserBattlePass(user_id=user_id, season=await active_season(wdb), current_level=1, current_xp=0)
+            wdb.add(prog)
+            await wdb.commit()
+            await wdb.refresh(prog)
+        replica.mark_written(user_id)
+        leaderboard.record(prog.season, user_id, prog.current_xp)
+    tiers = await get_tiers(db, prog.season)
+    return prog, tiers.next_level_xp(prog.current_level)
+
+def _upsert_xp_stmt(tiers: TierTable, grants: dict[int, int]):
+    """INSERT ... ON CONFLICT DO UPDATE adding xp and levelling up inside Postgres.
+
+    The new level is width_bucket() over the cached thresholds, the SQL twin of
+    TierTable.level_for_xp. Rows in a different season are left alone (not returned).
+    Rows go in user id order, so concurrent upserts lock them in the same order and can't deadlock.
+    """
+    stmt = pg_insert(UserBattlePass).values([
+        {"user_id": uid, "season": tiers.season, "current_level": tiers.level_for_xp(amount), "current_xp": amount}
+        for uid, amount in sorted(grants.items())
+    ])
+    new_xp = UserBattlePass.current_xp + stmt.excluded.current_xp
+    if tiers.thresholds:
+        new_level = 1 + func.width_bucket(new_xp, literal(tiers.thresholds, ARRAY(Integer)))
+    else:
+        new_level = literal(1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserBattlePass.user_id],
+        set_={"current_xp": new_xp, "current_level": func.greatest(UserBattlePass.current_level, new_level),
+              "updated_at": func.timezone("UTC", func.now())},
+        where=UserBattlePass.season == tiers.season,
+    )
+    return stmt.returning(UserBattlePass.user_id, UserBattlePass.season, UserBattlePass.current_level, UserBattlePass.current_xp)
+
+async def grant_xp(db: AsyncSession, grants: dict[int, int], season: str | None = None) -> dict:
+    """Apply {user_id: amount} in one statement without committing; returns {user_id: row}."""
+    tiers = await get_tiers(db, season or await active_season(db))
+    # The tables used, by season: _TIERS can be cleared by an invalidation while we await
+    tables = {tiers.season: tiers}
+    rows = {r.user_id: r for r in (await db.execute(_upsert_xp_stmt(tiers, grants))).all()}
+    missing = [uid for uid in grants if uid not in rows]
+    if missing:
+        # Progress rows from another season: group by their season and retry
+        res = await db.execute(select(UserBattlePass.user_id, UserBattlePass.season).where(UserBattlePass.user_id.in_(missing)))
+        by_season: dict[str, dict[int, int]] = {}
+        for uid, s in res.all():
+            by_season.setdefault(s, {})[uid] = grants[uid]
+        for s, sub in by_season.items():
+            other = tables[s] = await get_tiers(db, s)
+            rows.update({r.user_id: r for r in (await db.execute(_upsert_xp_stmt(other, sub))).all()})
+
+    # Team leaderboard deltas, applied by the team stats job after commit. The pre-grant level is
+    # derived from the pre-grant xp (exact unless tiers changed under the row); the reconcile job
+    # corrects any drift.
+    deltas = []
+    for uid, r in rows.items():
+        amount = grants[uid]
+        old_level = min(r.current_level, tables[r.season].level_for_xp(r.current_xp - amount))
+        deltas.append((uid, amount, r.current_level - old_level))
+    team_stats.defer_xp(db, deltas)
+    return rows
 
 async def add_xp(db: AsyncSession, user_id: int, amount: int):
-    prog, _ = await get_progress(db, user_id)
-    prog.current_xp += amount
-    # Level up loop
-    while True:
-        next_level = prog.current_level + 1
-        q = await db.execute(select(BattlePass).where(BattlePass.season==prog.season, BattlePass.level==next_level))
-        bp_next = q.scalar_one_or_none()
-        if not bp_next: break
-        if prog.current_xp >= bp_next.xp_required:
-            prog.current_level = next_level
-        else:
-            break
+    """Returns (progress row, next_level_xp)."""
+    prog = (await grant_xp(db, {user_id: amount}))[user_id]
     await db.commit()
-    await db.refresh(prog)
-    return prog
+    leaderboard.record(prog.season, user_id, prog.current_xp)
+    tiers = await get_tiers(db, prog.season)
+    return prog, tiers.next_level_xp(prog.current_level)
@@ -0,0 +1,153 @@
+"""
+Admin data exports, streamed from a server-side cursor.
+
+Each export holds one connection from db.export_engine for its whole download, inside a
+REPEATABLE READ, READ ONLY transaction, so the file is one consistent snapshot and a slow
+client never ties up a request connection. Rows go out one EXPORT_BATCH_SIZE cursor fetch
+at a time, so memory and time to first byte don't depend on table size.
+
+Incremental exports: every response carries X-Export-Watermark. Passing it back as since=
+returns the rows created (users, results) or changed (progress) from that point on. The
+watermark is held back to the start of the oldest transaction still open when the snapshot
+was taken, so a write that commits later is never skipped (it may appear twice instead;
+rows carry their keys, consumers upsert).
+"""
+import csv
+import io
+import json
+import anyio
+import anyio.lowlevel
+from datetime import datetime
+from typing import AsyncIterator
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from ..config import settings
+from ..db import EXPORT_APP_NAME, export_engine
+from ..models import GameResult, Team, User, UserBattlePass
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+class ExportBusy(Exception):
+    pass
+
+def _users():
+    stmt = (
+        select(User.id.label("user_id"), User.email, User.display_name, Team.code.label("team"), User.is_active,
+               User.google_sub.is_not(None).label("google_linked"), User.created_at,
+               UserBattlePass.season, UserBattlePass.current_level, UserBattlePass.current_xp)
+        .outerjoin(Team, Team.id == User.team_id)
+        .outerjoin(UserBattlePass, UserBattlePass.user_id == User.id)
+    )
+    return stmt, User.created_at
+
+def _progress():
+    stmt = (
+        select(UserBattlePass.user_id, Team.code.label("team"), UserBattlePass.season,
+               UserBattlePass.current_level, UserBattlePass.current_xp, UserBattlePass.updated_at)
+        .join(User, User.id == UserBattlePass.user_id)
+        .outerjoin(Team, Team.id == User.team_id)
+    )
+    return stmt, UserBattlePass.updated_at
+
+def _results():
+    stmt = (
+        select(GameResult.id, GameResult.user_id, Team.code.label("team"), GameResult.date_key, GameResult.guesses,
+               GameResult.won, GameResult.xp_awarded, GameResult.created_at)
+        .join(User, User.id == GameResult.user_id)
+        .outerjoin(Team, Team.id == User.team_id)
+    )
+    return stmt, GameResult.created_at
+
+# dataset -> (select, column since= filters on). No ORDER BY on purpose: over the joins it means
+# sorting the whole table before the first row; rows come in scan order and carry their keys.
+DATASETS = {"users": _users, "progress": _progress, "results": _results}
+
+_WATERMARK_SQL = text(
+    "SELECT timezone('UTC', least(now(), ("
+    "  SELECT min(xact_start) FROM pg_stat_activity"
+    "  WHERE datname = current_database() AND pid <> pg_backend_pid()"
+    "    AND backend_type = 'client backend' AND application_name <> :app"
+    ")))"
+)
+
+_stats = {"running": 0, "exports": 0, "rows": 0, "rejected": 0, "aborted": 0}
+
+def _encode(rows, columns: list[str], fmt: str) -> str:
+    if fmt == "csv":
+        buf = io.StringIO()
+        csv.writer(buf).writerows(
+            [v.isoformat() if isinstance(v, datetime) else v for v in row] for row in rows
+        )
+        return buf.getvalue()
+    return "".join(
+        json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=datetime.isoformat, separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+async def open_export(dataset: str, fmt: str, since: datetime | None) -> tuple[datetime, AsyncIterator[str]]:
+    """
+    Take a connection and the snapshot, then return (watermark, body chunks). Failing to get
+    either raises here, before any response is started. The iterator owns the connection:
+    exhaust it or close() it (Starlette abandons it on disconnect; pass close as background).
+    """
+    if _stats["running"] >= settings.EXPORT_POOL_SIZE:
+        _stats["rejected"] += 1
+        raise ExportBusy()
+    _stats["running"] += 1
+    try:
+        conn = await export_engine.connect()
+    except BaseException:
+        _stats["running"] -= 1
+        raise
+    try:
+        conn = await conn.execution_options(isolation_level="REPEATABLE READ")
+        await conn.execute(text("SET TRANSACTION READ ONLY"))
+        # Other exports are read-only, they don't hold the watermark back
+        watermark = await conn.scalar(_WATERMARK_SQL, {"app": EXPORT_APP_NAME})
+        stmt, changed = DATASETS[dataset]()
+        stmt = stmt.where(changed < watermark)
+        if since is not None:
+            stmt = stmt.where(changed >= since)
+    except BaseException:
+        await conn.close()
+        _stats["running"] -= 1
+        raise
+    body = _stream(conn, stmt, fmt)
+    # Run it up to the open cursor, so query errors surface here rather than mid-response
+    await body.__anext__()
+    return watermark, body
+
+async def _stream(conn: AsyncConnection, stmt, fmt: str) -> AsyncIterator[str]:
+    done = False
+    try:
+        # Fetches are shielded: a client disconnect cancels the task, and a cursor command cut off
+        # halfway leaves the connection unusable (and its transaction open). The cancellation is
+        # taken at the checkpoint between batches instead (sends to a gone client may not
+        # suspend, so without it the export would run to the end), where closing rolls back cleanly.
+        with anyio.CancelScope(shield=True):
+            result = await conn.stream(stmt, execution_options={"yield_per": settings.EXPORT_BATCH_SIZE})
+        columns = list(result.keys())
+        yield ""
+        if fmt == "csv":
+            yield _encode([columns], columns, fmt)
+        while True:
+            with anyio.CancelScope(shield=True):
+                rows = await result.fetchmany(settings.EXPORT_BATCH_SIZE)
+            await anyio.lowlevel.checkpoint()
+            if not rows:
+                break
+            _stats["rows"] += len(rows)
+            yield _encode(rows, columns, fmt)
+        done = True
+    finally:
+        _stats["running"] -= 1
+        _stats["exports" if done else "aborted"] += 1
+        with anyio.CancelScope(shield=True):
+            await conn.close()
+
+async def close(body: AsyncIterator[str]) -> None:
+    # A coroutine function on purpose: BackgroundTask would run a bare body.aclose in a thread
+    await body.aclose()
+
+def stats() -> dict:
+    return dict(_stats)
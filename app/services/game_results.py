@@ -0,0 +1,99 @@
+from datetime import date, datetime
+from typing import NamedTuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..models import GameResult, UserStats
+from . import battlepass, leaderboard, schedule
+from .write_behind import WriteBehindBuffer
+
+_CHUNK = 1000
+
+class PendingResult(NamedTuple):
+    user_id: int
+    date_key: str
+    guesses: int
+    won: bool
+
+def xp_for(guesses: int, won: bool) -> int:
+    if not won:
+        return settings.GAME_XP_LOSS
+    return settings.GAME_XP_WIN + settings.GAME_XP_PER_SPARE_GUESS * max(0, settings.GAME_MAX_GUESSES - guesses)
+
+def _apply(stats: UserStats, day: int, guesses: int, won: bool) -> None:
+    stats.games_played += 1
+    if won:
+        stats.wins += 1
+        hist = list(stats.guess_hist or [0] * settings.GAME_MAX_GUESSES)
+        if guesses > len(hist):
+            hist.extend([0] * (guesses - len(hist)))
+        hist[guesses - 1] += 1
+        stats.guess_hist = hist
+    # Streaks only move forward in time; a late result for an older day just counts
+    if stats.last_day is None or day > stats.last_day:
+        if won:
+            stats.current_streak = stats.current_streak + 1 if stats.last_day == day - 1 else 1
+        else:
+            stats.current_streak = 0
+        stats.max_streak = max(stats.max_streak, stats.current_streak)
+        stats.last_day = day
+
+async def record_results(db: AsyncSession, results: list[PendingResult]) -> dict:
+    """Insert results, update user_stats and grant XP without committing.
+    Duplicates of an already-recorded (user, day) are ignored. Returns {user_id: progress row}."""
+    inserted = []
+    for i in range(0, len(results), _CHUNK):
+        stmt = pg_insert(GameResult).values([
+            {**r._asdict(), "xp_awarded": xp_for(r.guesses, r.won)} for r in results[i:i + _CHUNK]
+        ]).on_conflict_do_nothing(index_elements=[GameResult.user_id, GameResult.date_key])
+        res = await db.execute(stmt.returning(GameResult.user_id, GameResult.date_key, GameResult.guesses,
+                                              GameResult.won, GameResult.xp_awarded))
+        inserted.extend(res.all())
+    if not inserted:
+        return {}
+
+    user_ids = sorted({r.user_id for r in inserted})
+    for i in range(0, len(user_ids), _CHUNK):
+        await db.execute(pg_insert(UserStats).values([{"user_id": uid} for uid in user_ids[i:i + _CHUNK]])
+                         .on_conflict_do_nothing(index_elements=[UserStats.user_id]))
+    # Row locks (in user id order) serialize workers flushing results for the same users
+    res = await db.execute(
+        select(UserStats).where(UserStats.user_id.in_(user_ids)).order_by(UserStats.user_id).with_for_update()
+    )
+    stats = {s.user_id: s for s in res.scalars()}
+    now = datetime.utcnow()
+    grants: dict[int, int] = {}
+    for r in sorted(inserted, key=lambda r: (r.user_id, r.date_key)):
+        s = stats[r.user_id]
+        _apply(s, schedule.day_index(date.fromisoformat(r.date_key)), r.guesses, r.won)
+        s.updated_at = now
+        grants[r.user_id] = grants.get(r.user_id, 0) + r.xp_awarded
+    await db.flush()
+
+    grants = {uid: xp for uid, xp in grants.items() if xp}
+    return await battlepass.grant_xp(db, grants) if grants else {}
+
+class ResultBuffer(WriteBehindBuffer):
+    """
+    Game results are queued in memory (first result per user and day wins) and written
+    in one transaction every GAME_RESULTS_FLUSH_INTERVAL_MS: results, stats and XP together.
+    """
+    name = "Game results"
+
+    def add(self, result: PendingResult) -> None:
+        self._add((result.user_id, result.date_key), result)
+
+    def _merge(self, into: dict, key, value) -> None:
+        # Newer submissions for the same day don't replace a queued one
+        into.setdefault(key, value)
+
+    async def _write(self, db: AsyncSession, batch: dict) -> dict:
+        return await record_results(db, list(batch.values()))
+
+    def _committed(self, rows: dict) -> None:
+        for r in rows.values():
+            leaderboard.record(r.season, r.user_id, r.current_xp)
+
+buffer = ResultBuffer(settings.GAME_RESULTS_FLUSH_INTERVAL_MS, settings.GAME_RESULTS_FLUSH_MAX_ENTRIES,
+                      settings.GAME_RESULTS_MAX_PENDING)
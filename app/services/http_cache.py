@@ -0,0 +1,43 @@
+import hashlib
+import json
+from typing import NamedTuple
+from fastapi import Request
+from fastapi.responses import Response
+from ..deps import seconds_until_riyadh_midnight
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str  # strong validator, quoted
+
+def encode(obj) -> CachedBody:
+    body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return CachedBody(body, f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"')
+
+def combined_etag(parts: list[CachedBody]) -> str:
+    h = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        h.update(part.etag.encode())
+    return f'"{h.hexdigest()}"'
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as If-None-Match requires (RFC 9110 13.1.2)
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def not_modified(request: Request, etag: str) -> bool:
+    inm = request.headers.get("if-none-match")
+    return bool(inm) and _matches(inm, etag)
+
+def cache_headers(etag: str, max_age: int | None = None) -> dict:
+    if max_age is None:
+        max_age = seconds_until_riyadh_midnight()
+    return {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+def respond(request: Request, cached: CachedBody, max_age: int | None = None) -> Response:
+    """200 with the pre-encoded body, or 304 when the client already has it. Cacheable
+    (browsers and CDNs) until the next Riyadh midnight unless max_age says otherwise."""
+    headers = cache_headers(cached.etag, max_age)
+    if not_modified(request, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -0,0 +1,67 @@
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from jose import jwt as jose_jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import User, Team
+from ..config import settings
+
+class InvalidToken(Exception):
+    pass
+
+class CurrentUser(NamedTuple):
+    id: int
+    email: str
+    display_name: str | None
+    team_id: int | None
+    team_code: str | None
+
+# token -> (user_id, exp as unix time); LRU-bounded
+_TOKENS: "OrderedDict[str, tuple[int, float]]" = OrderedDict()
+# user_id -> (profile, monotonic deadline); LRU-bounded, short TTL
+_PROFILES: "OrderedDict[int, tuple[CurrentUser, float]]" = OrderedDict()
+
+def user_id_for_token(token: str) -> int:
+    hit = _TOKENS.get(token)
+    if hit is not None:
+        if hit[1] > time.time():
+            _TOKENS.move_to_end(token)
+            return hit[0]
+        del _TOKENS[token]
+    try:
+        payload = jose_jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
+        user_id = int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise InvalidToken()
+    _TOKENS[token] = (user_id, float(payload.get("exp", "inf")))
+    if len(_TOKENS) > settings.AUTH_TOKEN_CACHE_SIZE:
+        _TOKENS.popitem(last=False)
+    return user_id
+
+async def get_profile(db: AsyncSession, user_id: int) -> CurrentUser | None:
+    hit = _PROFILES.get(user_id)
+    if hit is not None and hit[1] > time.monotonic():
+        _PROFILES.move_to_end(user_id)
+        return hit[0]
+    res = await db.execute(
+        select(User.id, User.email, User.display_name, User.team_id, Team.code)
+        .outerjoin(Team, Team.id == User.team_id)
+        .where(User.id == user_id)
+    )
+    row = res.first()
+    if row is None:
+        _PROFILES.pop(user_id, None)
+        return None
+    profile = CurrentUser(*row)
+    _PROFILES[user_id] = (profile, time.monotonic() + settings.AUTH_PROFILE_TTL_SECONDS)
+    _PROFILES.move_to_end(user_id)
+    if len(_PROFILES) > settings.AUTH_PROFILE_CACHE_SIZE:
+        _PROFILES.popitem(last=False)
+    return profile
+
+def invalidate_user(user_id: int | None = None) -> None:
+    if user_id is None:
+        _PROFILES.clear()
+    else:
+        _PROFILES.pop(user_id, None)
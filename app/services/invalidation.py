@@ -0,0 +1,146 @@
+"""
+Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+Writers call publish() inside their transaction, so the event is only delivered if
+the write commits. Every worker keeps one dedicated asyncpg connection listening on
+INVALIDATION_CHANNEL and applies events to its in-process caches. Missed events
+can't be replayed, so after any disconnect the listener flushes every cache once
+it is back.
+"""
+import asyncio
+import json
+import os
+import random
+import uuid
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from . import battlepass, identity, leaderboard, schedule, words
+from .teams import registry
+
+# Events this worker published itself were already applied locally
+_ORIGIN = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+def _words_changed(_value) -> None:
+    words.invalidate_index()
+    words.invalidate_daily()
+    schedule.reset_horizon()
+
+def _season_changed(_value) -> None:
+    battlepass.invalidate_active_season()
+    battlepass.invalidate_tiers()
+    leaderboard.invalidate()
+
+# kind -> handler(value); value is None for "everything of this kind"
+HANDLERS = {
+    "daily": words.invalidate_daily,          # date key of an override
+    "tiers": battlepass.invalidate_tiers,     # season
+    "teams": lambda _value: registry.invalidate(),
+    "user": identity.invalidate_user,         # user id (profile: team, display name)
+    "words": _words_changed,
+    "season": _season_changed,                # active season switched / rollover finished
+}
+
+def _payload(kind: str, value) -> str:
+    if kind not in HANDLERS:
+        raise ValueError(f"unknown invalidation kind: {kind}")
+    return json.dumps({"k": kind, "v": value, "o": _ORIGIN}, separators=(",", ":"))
+
+async def publish(db: AsyncSession, kind: str, value=None) -> None:
+    """Queue an event on the caller's transaction; it goes out on commit."""
+    await db.execute(select(func.pg_notify(settings.INVALIDATION_CHANNEL, _payload(kind, value))))
+
+async def publish_raw(conn: asyncpg.Connection, kind: str, value=None) -> None:
+    """publish() for a raw asyncpg connection; outside a transaction it goes out at once."""
+    await conn.execute("SELECT pg_notify($1, $2)", settings.INVALIDATION_CHANNEL, _payload(kind, value))
+
+def flush_all() -> None:
+    for handler in HANDLERS.values():
+        handler(None)
+    _stats["full_flushes"] += 1
+
+_stats = {"connected": False, "connections": 0, "received": 0, "applied": 0, "own": 0, "invalid": 0,
+          "full_flushes": 0}
+
+def _on_notify(_conn, _pid, _channel, payload: str) -> None:
+    _stats["received"] += 1
+    try:
+        event = json.loads(payload)
+        handler = HANDLERS[event["k"]]
+    except (ValueError, KeyError, TypeError):
+        _stats["invalid"] += 1
+        print(f"⚠ Ignoring invalidation event: {payload[:200]}")
+        return
+    if event.get("o") == _ORIGIN:
+        _stats["own"] += 1
+        return
+    handler(event.get("v"))
+    _stats["applied"] += 1
+
+def _dsn() -> str:
+    from ..db import engine
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+async def _listen_once(resumed: bool) -> None:
+    conn = await asyncpg.connect(_dsn())
+    lost = asyncio.Event()
+    conn.add_termination_listener(lambda _conn: lost.set())
+    try:
+        await conn.add_listener(settings.INVALIDATION_CHANNEL, _on_notify)
+        _stats["connected"] = True
+        _stats["connections"] += 1
+        if resumed:
+            # Events sent while we were away are gone; start from a clean slate
+            flush_all()
+            print("✓ Invalidation listener reconnected (caches flushed)")
+        while not lost.is_set():
+            try:
+                await asyncio.wait_for(lost.wait(), timeout=settings.INVALIDATION_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # A half-open socket never reports termination; a round trip does
+                await asyncio.wait_for(conn.execute("SELECT 1"), timeout=settings.INVALIDATION_KEEPALIVE_SECONDS)
+    finally:
+        _stats["connected"] = False
+        if not conn.is_closed():
+            conn.terminate()
+
+async def _run() -> None:
+    resumed = False
+    backoff = 0.5
+    while True:
+        connections = _stats["connections"]
+        try:
+            await _listen_once(resumed)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠ Invalidation listener error: {e}")
+        else:
+            print("⚠ Invalidation listener connection lost")
+        # Any gap (including a failed first connect) may have swallowed events
+        resumed = True
+        if _stats["connections"] > connections:
+            backoff = 0.5
+        await asyncio.sleep(backoff * (0.5 + random.random()))
+        backoff = min(backoff * 2, settings.INVALIDATION_BACKOFF_MAX_SECONDS)
+
+_TASK: asyncio.Task | None = None
+
+def start() -> None:
+    global _TASK
+    if _TASK is None and settings.INVALIDATION_ENABLED:
+        _TASK = asyncio.create_task(_run())
+
+async def stop() -> None:
+    global _TASK
+    if _TASK is not None:
+        _TASK.cancel()
+        try:
+            await _TASK
+        except asyncio.CancelledError:
+            pass
+        _TASK = None
+
+def stats() -> dict:
+    return dict(_stats)
@@ -0,0 +1,150 @@
+import asyncio
+from bisect import bisect_left, bisect_right, insort
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import UserBattlePass
+from ..config import settings
+
+class XPRanking:
+    """
+    Order statistics over current_xp for one season: a Fenwick tree counting players per
+    fixed-width xp bucket, plus the sorted exact values inside each bucket. rank() and
+    record() are O(log n + bucket size); memory is O(players + max_xp / bucket width).
+    """
+
+    def __init__(self, bucket_width: int):
+        self.width = bucket_width
+        self.tree = [0] * 65           # 1-based Fenwick over buckets, grown by doubling
+        self.buckets: dict[int, list[int]] = {}
+        self.xp: dict[int, int] = {}   # user_id -> xp
+        self.total = 0
+
+    def _bucket(self, xp: int) -> int:
+        return max(0, xp // self.width)
+
+    def _grow(self, bucket: int) -> None:
+        size = len(self.tree) - 1
+        while size <= bucket:
+            size *= 2
+        self.tree = [0] * (size + 1)
+        for b, values in self.buckets.items():
+            self.tree[b + 1] += len(values)
+        for i in range(1, size + 1):
+            j = i + (i & -i)
+            if j <= size:
+                self.tree[j] += self.tree[i]
+
+    def _add(self, bucket: int, delta: int) -> None:
+        i = bucket + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, bucket: int) -> int:
+        """Players in buckets 0..bucket."""
+        i, total = min(bucket + 1, len(self.tree) - 1), 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def record(self, user_id: int, xp: int) -> None:
+        old = self.xp.get(user_id)
+        if old == xp:
+            return
+        if old is not None:
+            b = self._bucket(old)
+            values = self.buckets[b]
+            values.pop(bisect_left(values, old))
+            self._add(b, -1)
+            self.total -= 1
+        b = self._bucket(xp)
+        if b >= len(self.tree) - 1:
+            self._grow(b)
+        insort(self.buckets.setdefault(b, []), xp)
+        self._add(b, 1)
+        self.total += 1
+        self.xp[user_id] = xp
+
+    def rank(self, xp: int) -> int:
+        """1 + number of players with strictly more xp (ties share a rank)."""
+        b = self._bucket(xp)
+        values = self.buckets.get(b, ())
+        return 1 + (self.total - self._prefix(b)) + (len(values) - bisect_right(values, xp))
+
+    @classmethod
+    def build(cls, bucket_width: int, rows) -> "XPRanking":
+        r = cls(bucket_width)
+        top = -1
+        for user_id, xp in rows:
+            b = r._bucket(xp)
+            r.buckets.setdefault(b, []).append(xp)
+            r.xp[user_id] = xp
+            top = max(top, b)
+        for values in r.buckets.values():
+            values.sort()
+        r.total = len(r.xp)
+        r._grow(top)
+        return r
+
+_RANKINGS: dict[str, XPRanking] = {}
+
+async def load(db: AsyncSession, season: str) -> XPRanking:
+    res = await db.stream(
+        select(UserBattlePass.user_id, UserBattlePass.current_xp).where(UserBattlePass.season == season)
+    )
+    rows = [tuple(r) async for r in res]
+    ranking = XPRanking.build(settings.LEADERBOARD_BUCKET_XP, rows)
+    _RANKINGS[season] = ranking
+    return ranking
+
+async def get_ranking(db: AsyncSession, season: str) -> XPRanking:
+    ranking = _RANKINGS.get(season)
+    if ranking is None:
+        ranking = await load(db, season)
+    return ranking
+
+def invalidate(season: str | None = None) -> None:
+    if season is None:
+        _RANKINGS.clear()
+    else:
+        _RANKINGS.pop(season, None)
+
+def player_count(season: str) -> int:
+    ranking = _RANKINGS.get(season)
+    return ranking.total if ranking is not None else 0
+
+def record(season: str, user_id: int, xp: int) -> None:
+    """Apply a committed xp value; seasons not loaded yet are built on first read."""
+    ranking = _RANKINGS.get(season)
+    if ranking is not None:
+        ranking.record(user_id, xp)
+
+async def _run() -> None:
+    # Other workers' grants only reach this process through a periodic rebuild
+    from ..db import AsyncSessionLocal
+    while True:
+        await asyncio.sleep(settings.LEADERBOARD_REBUILD_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                for season in list(_RANKINGS):
+                    await load(db, season)
+        except Exception as e:
+            print(f"⚠ Leaderboard rebuild failed: {e}")
+
+_TASK: asyncio.Task | None = None
+
+def start() -> None:
+    global _TASK
+    if _TASK is None:
+        _TASK = asyncio.create_task(_run())
+
+async def stop() -> None:
+    global _TASK
+    if _TASK is not None:
+        _TASK.cancel()
+        try:
+            await _TASK
+        except asyncio.CancelledError:
+            pass
+        _TASK = None
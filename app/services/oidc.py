@@ -0,0 +1,247 @@
+import asyncio
+import secrets
+from datetime import datetime, timedelta, timezone
+from time import monotonic, perf_counter
+from urllib.parse import urlencode
+import httpx
+from jose import jwt, JWTError
+from ..config import settings
+
+class OIDCError(Exception):
+    """Identity provider unreachable, or it returned something we can't accept."""
+
+class CallStats:
+    __slots__ = ("count", "errors", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float, ok: bool) -> None:
+        self.count += 1
+        self.errors += not ok
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+class _Cached:
+    """One JSON document with a TTL. Past `refresh_at` it is served while a single
+    background fetch replaces it; past `expires_at` callers wait for the fetch."""
+
+    def __init__(self, fetch):
+        self._fetch = fetch
+        self.value: dict | None = None
+        self.fetched_at = 0.0
+        self.refresh_at = 0.0
+        self.expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def reload(self, min_age: float = 0.0) -> dict:
+        """Fetch now, unless another caller fetched within the last `min_age` seconds."""
+        async with self._lock:
+            now = monotonic()
+            if self.value is not None and now - self.fetched_at < min_age:
+                return self.value
+            value, ttl = await self._fetch()
+            now = monotonic()
+            self.value, self.fetched_at = value, now
+            self.refresh_at = now + ttl * 0.8
+            self.expires_at = now + ttl
+            return value
+
+    async def _background(self) -> None:
+        try:
+            await self.reload()
+        except Exception as e:
+            print(f"⚠ OIDC background refresh failed: {e}")
+        finally:
+            self._task = None
+
+    async def get(self) -> dict:
+        now = monotonic()
+        if self.value is not None and now < self.expires_at:
+            if now >= self.refresh_at and self._task is None:
+                self._task = asyncio.create_task(self._background())
+            return self.value
+        # Concurrent misses wait on the lock and reuse the first caller's fetch
+        return await self.reload(min_age=1.0)
+
+    def age(self) -> float | None:
+        return None if self.value is None else monotonic() - self.fetched_at
+
+def _json(call: str, resp: httpx.Response) -> dict:
+    try:
+        body = resp.json()
+    except ValueError as e:
+        raise OIDCError(f"{call} returned invalid JSON: {e}") from e
+    if not isinstance(body, dict):
+        raise OIDCError(f"{call} returned {type(body).__name__}, expected an object")
+    return body
+
+def _max_age(resp: httpx.Response) -> float | None:
+    for part in resp.headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name == "max-age" and value.isdigit():
+            return float(value)
+    return None
+
+class OIDCProvider:
+    """
+    Discovery document, JWKS and token exchange for one OpenID Connect provider.
+    All calls share one pooled keep-alive httpx client, created on first use.
+    """
+
+    def __init__(self, discovery_url: str, client_id: str, client_secret: str, scope: str = "openid email profile"):
+        self.discovery_url = discovery_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self._client: httpx.AsyncClient | None = None
+        self._metadata = _Cached(self._fetch_metadata)
+        self._jwks = _Cached(self._fetch_jwks)
+        self._jwks_forced_at = float("-inf")
+        self.calls: dict[str, CallStats] = {"discovery": CallStats(), "jwks": CallStats(), "token": CallStats()}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.OIDC_HTTP_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.OIDC_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OIDC_HTTP_MAX_CONNECTIONS,
+                    keepalive_expiry=60,
+                ),
+            )
+        return self._client
+
+    async def _request(self, call: str, method: str, url: str, **kwargs) -> httpx.Response:
+        t0 = perf_counter()
+        ok = False
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+            ok = resp.status_code < 400
+            return resp
+        except httpx.HTTPError as e:
+            raise OIDCError(f"{call} request failed: {e}") from e
+        finally:
+            self.calls[call].observe((perf_counter() - t0) * 1000, ok)
+
+    async def _fetch_json(self, call: str, url: str) -> tuple[dict, float]:
+        resp = await self._request(call, "GET", url)
+        if resp.status_code != 200:
+            raise OIDCError(f"{call} returned HTTP {resp.status_code}")
+        ttl = _max_age(resp) or settings.OIDC_METADATA_TTL_SECONDS
+        return _json(call, resp), min(max(ttl, 60.0), settings.OIDC_METADATA_TTL_SECONDS)
+
+    async def _fetch_metadata(self) -> tuple[dict, float]:
+        meta, ttl = await self._fetch_json("discovery", self.discovery_url)
+        missing = [k for k in ("issuer", "authorization_endpoint", "token_endpoint", "jwks_uri") if not meta.get(k)]
+        if missing:
+            raise OIDCError(f"discovery document lacks {', '.join(missing)}")
+        return meta, ttl
+
+    async def _fetch_jwks(self) -> tuple[dict, float]:
+        meta = await self.metadata()
+        return await self._fetch_json("jwks", meta["jwks_uri"])
+
+    async def metadata(self) -> dict:
+        return await self._metadata.get()
+
+    async def jwks(self) -> dict:
+        return await self._jwks.get()
+
+    async def authorization_url(self, redirect_uri: str) -> str:
+        meta = await self.metadata()
+        # state is self-contained (signed, short-lived) so the callback can land on any worker
+        nonce = secrets.token_urlsafe(16)
+        state = jwt.encode(
+            {"nonce": nonce, "exp": datetime.now(timezone.utc) + timedelta(minutes=10)},
+            settings.JWT_SECRET, algorithm=settings.JWT_ALG,
+        )
+        query = urlencode({
+            "response_type": "code",
+            "client_id": self.client_id,
+            "redirect_uri": redirect_uri,
+            "scope": self.scope,
+            "state": state,
+            "nonce": nonce,
+        })
+        return f"{meta['authorization_endpoint']}?{query}"
+
+    async def exchange_code(self, code: str, redirect_uri: str) -> dict:
+        meta = await self.metadata()
+        resp = await self._request("token", "POST", meta["token_endpoint"], data={
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": redirect_uri,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+        })
+        if resp.status_code != 200:
+            raise OIDCError(f"token endpoint returned HTTP {resp.status_code}")
+        return _json("token", resp)
+
+    async def verify_id_token(self, id_token: str, nonce: str | None = None) -> dict:
+        meta = await self.metadata()
+        try:
+            kid = jwt.get_unverified_header(id_token).get("kid")
+        except JWTError as e:
+            raise OIDCError(f"malformed id_token: {e}") from e
+        jwks = await self.jwks()
+        if kid and not any(k.get("kid") == kid for k in jwks.get("keys", [])):
+            # Unknown kid: the provider rotated keys. Refetch at most every 30s; callers
+            # arriving during a refetch wait for it and reuse the result
+            if monotonic() - self._jwks_forced_at >= 30:
+                self._jwks_forced_at = monotonic()
+                jwks = await self._jwks.reload()
+            else:
+                jwks = await self._jwks.reload(min_age=30.0)
+        issuer = meta["issuer"]
+        try:
+            claims = jwt.decode(
+                id_token, jwks, algorithms=settings.OIDC_ID_TOKEN_ALGORITHMS,
+                audience=self.client_id, issuer=(issuer, issuer.removeprefix("https://")),
+                options={"verify_at_hash": False},
+            )
+        except JWTError as e:
+            raise OIDCError(f"invalid id_token: {e}") from e
+        if nonce is not None and claims.get("nonce") != nonce:
+            raise OIDCError("id_token nonce mismatch")
+        return claims
+
+    async def complete(self, code: str, state: str, redirect_uri: str) -> dict:
+        """Callback half of the code flow: check state, exchange the code, verify the id_token."""
+        try:
+            nonce = jwt.decode(state, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])["nonce"]
+        except (JWTError, KeyError) as e:
+            raise OIDCError("invalid or expired state") from e
+        token = await self.exchange_code(code, redirect_uri)
+        if "id_token" not in token:
+            raise OIDCError("token response has no id_token")
+        return await self.verify_id_token(token["id_token"], nonce)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        age = self._metadata.age()
+        return {
+            "calls": {name: s.as_dict() for name, s in self.calls.items()},
+            "metadata_age_s": None if age is None else round(age, 1),
+            "jwks_keys": len((self._jwks.value or {}).get("keys", [])),
+        }
+
+google = OIDCProvider(settings.GOOGLE_DISCOVERY_URL, settings.GOOGLE_CLIENT_ID, settings.GOOGLE_CLIENT_SECRET)
@@ -0,0 +1,100 @@
+import hashlib
+from datetime import date, timedelta
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import DictionaryWord, DailyOverride, DailySchedule
+from ..config import settings
+
+# Day 0 of the rotation. Each cycle is a keyed-hash permutation of the word IDs, so a word
+# added mid-cycle lands in the not-yet-materialized remainder without shifting earlier days.
+SCHEDULE_EPOCH = date(2025, 1, 1)
+_INSERT_CHUNK = 1000
+
+# Last materialized day known to this process (-1 = unknown, check the table)
+_HORIZON: int = -1
+
+def day_index(d: date) -> int:
+    return (d - SCHEDULE_EPOCH).days
+
+def _rank(cycle: int, word_id: int) -> bytes:
+    return hashlib.blake2b(f"{settings.DAILY_SCHEDULE_SEED}:{cycle}:{word_id}".encode(), digest_size=8).digest()
+
+def _cycle_order(cycle: int, ids) -> list[int]:
+    return sorted(ids, key=lambda i: _rank(cycle, i))
+
+def reset_horizon() -> None:
+    global _HORIZON
+    _HORIZON = -1
+
+async def extend_schedule(db: AsyncSession, through_day: int) -> int:
+    """Materialize schedule rows up to ``through_day``; returns the new horizon."""
+    global _HORIZON
+    last = (await db.execute(
+        select(DailySchedule.day, DailySchedule.cycle).order_by(DailySchedule.day.desc()).limit(1)
+    )).first()
+    last_day, cycle = (last.day, last.cycle) if last else (-1, 0)
+    if last_day >= through_day:
+        _HORIZON = last_day
+        return last_day
+
+    ids = (await db.execute(select(DictionaryWord.id))).scalars().all()
+    if not ids:
+        return last_day
+    used = set()
+    if last:
+        used = set((await db.execute(
+            select(DailySchedule.dictionary_word_id).where(DailySchedule.cycle == cycle)
+        )).scalars().all())
+    remaining = _cycle_order(cycle, set(ids) - used)
+    pos = 0
+
+    rows = []
+    while last_day < through_day:
+        if pos == len(remaining):
+            cycle += 1
+            remaining, pos = _cycle_order(cycle, ids), 0
+        last_day += 1
+        rows.append({
+            "day": last_day,
+            "date_key": (SCHEDULE_EPOCH + timedelta(days=last_day)).isoformat(),
+            "cycle": cycle,
+            "dictionary_word_id": remaining[pos],
+        })
+        pos += 1
+
+    # Concurrent workers compute identical rows from the same table state
+    for i in range(0, len(rows), _INSERT_CHUNK):
+        await db.execute(pg_insert(DailySchedule).values(rows[i:i + _INSERT_CHUNK]).on_conflict_do_nothing())
+    await db.commit()
+    _HORIZON = last_day
+    return last_day
+
+def needs_extension(day: int) -> bool:
+    return day > _HORIZON
+
+async def ensure_schedule(db: AsyncSession, day: int) -> None:
+    if needs_extension(day):
+        await extend_schedule(db, day + settings.DAILY_SCHEDULE_LOOKAHEAD_DAYS)
+
+def _resolved(*where):
+    word_id = func.coalesce(DailyOverride.dictionary_word_id, DailySchedule.dictionary_word_id)
+    return (
+        select(DailySchedule.day, DictionaryWord, DailyOverride.id)
+        .select_from(DailySchedule)
+        .outerjoin(DailyOverride, DailyOverride.date_key == DailySchedule.date_key)
+        .join(DictionaryWord, DictionaryWord.id == word_id)
+        .where(*where)
+    )
+
+async def lookup(db: AsyncSession, day: int):
+    """One indexed lookup: (DictionaryWord, is_override) for a schedule day, or None."""
+    row = (await db.execute(_resolved(DailySchedule.day == day))).first()
+    if row is None:
+        return None
+    return row[1], row[2] is not None
+
+async def lookup_range(db: AsyncSession, first_day: int, last_day: int) -> dict:
+    """day -> (DictionaryWord, is_override) for a span of days, in one query."""
+    res = await db.execute(_resolved(DailySchedule.day.between(first_day, last_day)))
+    return {day: (word, override_id is not None) for day, word, override_id in res.all()}
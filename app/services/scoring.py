@@ -0,0 +1,55 @@
+from collections import Counter
+from .arabic import normalize
+
+ABSENT, PRESENT, CORRECT = 0, 1, 2
+_MEMO_MAX = 8192
+
+def letters(word: str) -> str:
+    """Scoring key: normalized letters only. NFKC in normalize() folds the contextual
+    (initial/medial/final/isolated) presentation forms and the lam-alef ligatures."""
+    return "".join(normalize(word).split())
+
+class Answer:
+    """A day's answer, prepared once: its letters and letter-count vector."""
+    __slots__ = ("word", "key", "length", "counts", "memo")
+
+    def __init__(self, word: str):
+        self.word = word
+        self.key = letters(word)
+        self.length = len(self.key)
+        self.counts = dict(Counter(self.key))
+        # Players converge on the same guesses; marks are reused (treat them as read-only)
+        self.memo: dict[str, list[int] | None] = {}
+
+    def score(self, guess_key: str) -> list[int] | None:
+        """Wordle marks per position (2 correct, 1 present, 0 absent); None on a length mismatch.
+        Greens are taken first, so repeated letters only go yellow while the answer has spares."""
+        if len(guess_key) != self.length:
+            return None
+        marks = [ABSENT] * self.length
+        remaining = self.counts.copy()
+        i = 0
+        for g, a in zip(guess_key, self.key):
+            if g == a:
+                marks[i] = CORRECT
+                remaining[g] -= 1
+            i += 1
+        i = 0
+        for g in guess_key:
+            if not marks[i] and remaining.get(g, 0) > 0:
+                marks[i] = PRESENT
+                remaining[g] -= 1
+            i += 1
+        return marks
+
+    def score_many(self, guess_keys: list[str]) -> list[list[int] | None]:
+        memo, score = self.memo, self.score
+        out = []
+        for k in guess_keys:
+            marks = memo.get(k)
+            if marks is None and k not in memo:
+                if len(memo) >= _MEMO_MAX:
+                    memo.clear()
+                marks = memo[k] = score(k)
+            out.append(marks)
+        return out
@@ -0,0 +1,160 @@
+import asyncio
+from datetime import datetime
+from time import perf_counter
+from sqlalchemy import select, update, func, literal, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import BattlePass, Season, SeasonRollover, UserBattlePass, UserBattlePassHistory
+from . import battlepass, invalidation, team_stats
+from .battlepass import TierTable
+
+ROLLOVER_LOCK_ID = 0x4B4C4D02  # pg advisory lock: one rollover at a time
+MODES = ("reset", "carry")
+
+class RolloverError(Exception):
+    pass
+
+async def _copy_tiers(db: AsyncSession, from_season: str, to_season: str) -> int:
+    """New season's tiers copied from the old one, unless they were set up beforehand."""
+    if (await db.execute(select(BattlePass.id).where(BattlePass.season == to_season).limit(1))).first():
+        return 0
+    res = await db.execute(
+        pg_insert(BattlePass).from_select(
+            ["season", "level", "xp_required", "reward"],
+            select(literal(to_season), BattlePass.level, BattlePass.xp_required, BattlePass.reward)
+            .where(BattlePass.season == from_season),
+        ).on_conflict_do_nothing()
+    )
+    return res.rowcount
+
+async def begin(db: AsyncSession, to_season: str, from_season: str | None = None,
+                mode: str = "reset", carry_percent: int = 0) -> SeasonRollover:
+    """
+    Start (or pick up) a rollover: record its state, make sure the new season has tiers and
+    switch the active season, so new players and grants land in it right away. Commits.
+    Rows still in the old season keep working until their chunk is rolled.
+    """
+    state = await db.get(SeasonRollover, to_season)
+    if state is None:
+        if mode not in MODES:
+            raise RolloverError(f"mode must be one of {', '.join(MODES)}")
+        if not 0 <= carry_percent <= 100:
+            raise RolloverError("carry percent must be between 0 and 100")
+        if await db.get(Season, to_season) is not None:
+            raise RolloverError(f"season {to_season} already exists")
+        battlepass.invalidate_active_season()
+        from_season = from_season or await battlepass.active_season(db)
+        if from_season == to_season:
+            raise RolloverError("new season must differ from the old one")
+        state = SeasonRollover(to_season=to_season, from_season=from_season, mode=mode,
+                               carry_percent=carry_percent if mode == "carry" else 0,
+                               last_user_id=0, rows_done=0, started_at=datetime.utcnow())
+        db.add(state)
+    elif state.finished_at is not None:
+        return state
+
+    await _copy_tiers(db, state.from_season, to_season)
+    if (await db.execute(select(BattlePass.id).where(BattlePass.season == to_season).limit(1))).first() is None:
+        raise RolloverError(f"no tiers for {to_season} (and none to copy from {state.from_season})")
+    now = datetime.utcnow()
+    await db.execute(update(Season).where(Season.code != to_season, Season.ended_at.is_(None)).values(ended_at=now))
+    await db.execute(pg_insert(Season).values(code=to_season, started_at=now).on_conflict_do_nothing())
+    await invalidation.publish(db, "season", to_season)
+    await db.commit()
+    battlepass.invalidate_active_season()
+    battlepass.invalidate_tiers(to_season)
+    return state
+
+def _chunk_stmt(state: SeasonRollover, tiers: TierTable, chunk_size: int):
+    """
+    One set-based step: lock the next chunk of old-season rows (keyset on user_id), archive
+    them to user_battle_pass_history and move them to the new season, reset or carried over.
+    """
+    batch = (
+        select(UserBattlePass.user_id, UserBattlePass.current_level, UserBattlePass.current_xp)
+        .where(UserBattlePass.season == state.from_season, UserBattlePass.user_id > state.last_user_id)
+        .order_by(UserBattlePass.user_id)
+        .limit(chunk_size)
+        .with_for_update()
+        .cte("batch")
+    )
+    archived = (
+        pg_insert(UserBattlePassHistory).from_select(
+            ["user_id", "season", "current_level", "current_xp", "archived_at"],
+            select(batch.c.user_id, literal(state.from_season), batch.c.current_level, batch.c.current_xp,
+                   func.timezone("UTC", func.now())),
+        ).on_conflict_do_nothing()
+        .cte("archived")
+    )
+    if state.mode == "carry":
+        new_xp = batch.c.current_xp * state.carry_percent // 100
+    else:
+        new_xp = literal(0)
+    if tiers.thresholds:
+        new_level = 1 + func.width_bucket(new_xp, literal(tiers.thresholds, ARRAY(Integer)))
+    else:
+        new_level = literal(1)
+    # Core table, not the mapped class: RETURNING reads columns of the batch CTE too
+    ubp = UserBattlePass.__table__
+    return (
+        update(ubp)
+        .where(ubp.c.user_id == batch.c.user_id)
+        .values(season=state.to_season, current_xp=new_xp, current_level=new_level)
+        .returning(ubp.c.user_id, batch.c.current_xp, batch.c.current_level, ubp.c.current_xp, ubp.c.current_level)
+        .add_cte(archived)
+    )
+
+async def roll_chunk(db: AsyncSession, state: SeasonRollover, tiers: TierTable, chunk_size: int) -> int:
+    """Roll one chunk and advance the cursor in the same transaction. Commits; returns rows rolled."""
+    rows = (await db.execute(_chunk_stmt(state, tiers, chunk_size))).all()
+    if not rows:
+        return 0
+    # Team totals follow the xp/level change of every rolled member
+    await team_stats.apply_xp(db, [
+        (uid, new_xp - old_xp, new_level - old_level)
+        for uid, old_xp, old_level, new_xp, new_level in rows
+        if new_xp != old_xp or new_level != old_level
+    ])
+    state.last_user_id = max(r[0] for r in rows)
+    state.rows_done += len(rows)
+    await db.commit()
+    return len(rows)
+
+async def finish(db: AsyncSession, state: SeasonRollover) -> None:
+    state.finished_at = datetime.utcnow()
+    # Workers drop their rankings, which still hold partially rolled seasons
+    await invalidation.publish(db, "season", state.to_season)
+    await db.commit()
+
+async def rollover(db: AsyncSession, to_season: str, from_season: str | None = None, mode: str = "reset",
+                   carry_percent: int = 0, chunk_size: int = 5000, pause: float = 0.0,
+                   report_every: float = 2.0) -> dict:
+    """Run (or resume) a rollover to completion; each chunk is its own short transaction."""
+    state = await begin(db, to_season, from_season, mode, carry_percent)
+    if state.finished_at is not None:
+        print(f"✓ Rollover to {to_season} already finished ({state.rows_done} rows)")
+        return {"to_season": to_season, "rows": state.rows_done, "resumed_rows": 0, "seconds": 0.0, "rows_per_second": 0.0}
+    if state.rows_done:
+        print(f"✓ Resuming rollover {state.from_season} → {to_season} after user {state.last_user_id} "
+              f"({state.rows_done} rows already rolled)")
+    tiers = await battlepass.get_tiers(db, to_season)
+
+    started = last_report = perf_counter()
+    rows = 0
+    while True:
+        n = await roll_chunk(db, state, tiers, chunk_size)
+        rows += n
+        now = perf_counter()
+        if n < chunk_size:
+            break
+        if now - last_report >= report_every:
+            print(f"⏱ {state.from_season} → {to_season}: {state.rows_done} rows ({rows / (now - started):.0f} rows/s)")
+            last_report = now
+        if pause:
+            await asyncio.sleep(pause)
+    await finish(db, state)
+    seconds = perf_counter() - started
+    rate = rows / seconds if seconds else 0.0
+    print(f"✓ Rollover {state.from_season} → {to_season} done: {rows} rows in {seconds:.1f}s ({rate:.0f} rows/s)")
+    return {"to_season": to_season, "rows": state.rows_done, "resumed_rows": rows,
+            "seconds": round(seconds, 3), "rows_per_second": round(rate, 1)}
@@ -0,0 +1,187 @@
+import asyncio
+from datetime import datetime
+from time import monotonic
+from sqlalchemy import event, select, func, update, values, column, Integer, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models import Team, TeamStats, User, UserBattlePass
+from ..config import settings
+
+# team_id -> (total_xp, member_count, level_sum), mirrored from team_stats
+_SNAPSHOT: dict[int, tuple[int, int, int]] = {}
+_RECONCILE_LOCK_ID = 0x4B4C4D01  # pg advisory lock: one worker reconciles at a time
+# user_id -> (xp, levels) from committed grants, added to team_stats by the periodic job. Kept
+# out of the grant transactions, which would otherwise all queue on the same 13 rows.
+_DELTAS: dict[int, tuple[int, int]] = {}
+_DELTA_CHUNK = 5000  # rows per apply_xp statement (3 bind params each)
+
+def _store(rows) -> None:
+    from .teams import registry
+    for team_id, total_xp, member_count, level_sum in rows:
+        _SNAPSHOT[team_id] = (total_xp, member_count, level_sum)
+        # Shared counts keep balanced team assignment accurate across workers
+        if team_id in registry.members:
+            registry.members[team_id] = member_count
+
+async def refresh_snapshot(db: AsyncSession) -> None:
+    res = await db.execute(select(TeamStats.team_id, TeamStats.total_xp, TeamStats.member_count, TeamStats.level_sum))
+    _SNAPSHOT.clear()
+    _store(res.all())
+
+def snapshot() -> dict[int, tuple[int, int, int]]:
+    return _SNAPSHOT
+
+async def apply_xp(db: AsyncSession, deltas: list[tuple[int, int, int]]) -> None:
+    """Add (user_id, xp_delta, level_delta) to each user's team. Does not commit."""
+    if not deltas:
+        return
+    # Rows locked in team order first: an UPDATE ... FROM locks them in join order, and every
+    # writer of team_stats (grant flushes, rollover chunks, team changes) must agree on one
+    await db.execute(select(TeamStats.team_id).order_by(TeamStats.team_id).with_for_update())
+    v = values(column("user_id", Integer), column("dxp", Integer), column("dlvl", Integer), name="v").data(deltas)
+    per_team = (
+        select(User.team_id, func.sum(v.c.dxp).label("dxp"), func.sum(v.c.dlvl).label("dlvl"))
+        .join(User, User.id == v.c.user_id)
+        .where(User.team_id.is_not(None))
+        .group_by(User.team_id)
+        .subquery()
+    )
+    res = await db.execute(
+        update(TeamStats)
+        .where(TeamStats.team_id == per_team.c.team_id)
+        .values(total_xp=TeamStats.total_xp + per_team.c.dxp, level_sum=TeamStats.level_sum + per_team.c.dlvl)
+        .returning(TeamStats.team_id, TeamStats.total_xp, TeamStats.member_count, TeamStats.level_sum)
+    )
+    _store(res.all())
+
+def defer_xp(db: AsyncSession, deltas: list[tuple[int, int, int]]) -> None:
+    """Queue (user_id, xp_delta, level_delta) for the team totals once db commits."""
+    db.info.setdefault("team_xp", []).extend(deltas)
+
+@event.listens_for(Session, "after_commit")
+def _queue_committed(session: Session) -> None:
+    for uid, dxp, dlvl in session.info.pop("team_xp", ()):
+        xp, lvl = _DELTAS.get(uid, (0, 0))
+        _DELTAS[uid] = (xp + dxp, lvl + dlvl)
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_uncommitted(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("team_xp", None)
+
+async def flush_xp(db: AsyncSession) -> None:
+    """Apply the queued deltas in one transaction. Commits; on failure they stay queued."""
+    global _DELTAS
+    if not _DELTAS:
+        return
+    deltas, _DELTAS = _DELTAS, {}
+    try:
+        items = [(uid, xp, lvl) for uid, (xp, lvl) in deltas.items()]
+        for i in range(0, len(items), _DELTA_CHUNK):
+            await apply_xp(db, items[i:i + _DELTA_CHUNK])
+        await db.commit()
+    except BaseException:
+        for uid, (dxp, dlvl) in deltas.items():
+            xp, lvl = _DELTAS.get(uid, (0, 0))
+            _DELTAS[uid] = (xp + dxp, lvl + dlvl)
+        raise
+
+async def move_member(db: AsyncSession, old_team_id: int | None, new_team_id: int | None, xp: int = 0, level: int = 1) -> None:
+    """Move one member's contribution between teams (None = no team). Does not commit."""
+    if old_team_id == new_team_id:
+        return
+    # In team id order, like apply_xp, so concurrent writers can't deadlock
+    for team_id, sign in sorted((t, s) for t, s in ((old_team_id, -1), (new_team_id, 1)) if t is not None):
+        res = await db.execute(
+            update(TeamStats)
+            .where(TeamStats.team_id == team_id)
+            .values(member_count=TeamStats.member_count + sign,
+                    total_xp=TeamStats.total_xp + sign * xp,
+                    level_sum=TeamStats.level_sum + sign * level)
+            .returning(TeamStats.team_id, TeamStats.total_xp, TeamStats.member_count, TeamStats.level_sum)
+        )
+        _store(res.all())
+
+async def reconcile(db: AsyncSession) -> bool:
+    """Rebuild team_stats from users/user_battle_pass; skipped if another worker holds the lock."""
+    got = (await db.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": _RECONCILE_LOCK_ID})).scalar()
+    if not got:
+        await db.rollback()
+        return False
+    agg = (
+        select(
+            User.team_id.label("team_id"),
+            func.count().label("member_count"),
+            func.coalesce(func.sum(UserBattlePass.current_xp), 0).label("total_xp"),
+            func.sum(func.coalesce(UserBattlePass.current_level, 1)).label("level_sum"),
+        )
+        .outerjoin(UserBattlePass, UserBattlePass.user_id == User.id)
+        .where(User.team_id.is_not(None))
+        .group_by(User.team_id)
+        .subquery()
+    )
+    src = (
+        select(
+            Team.id,
+            func.coalesce(agg.c.total_xp, 0),
+            func.coalesce(agg.c.member_count, 0),
+            func.coalesce(agg.c.level_sum, 0),
+            func.now(),
+        )
+        .outerjoin(agg, agg.c.team_id == Team.id)
+    )
+    stmt = pg_insert(TeamStats).from_select(
+        ["team_id", "total_xp", "member_count", "level_sum", "reconciled_at"], src
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TeamStats.team_id],
+        set_={c: stmt.excluded[c] for c in ("total_xp", "member_count", "level_sum", "reconciled_at")},
+    ).returning(TeamStats.team_id, TeamStats.total_xp, TeamStats.member_count, TeamStats.level_sum)
+    res = await db.execute(stmt)
+    rows = res.all()
+    await db.commit()
+    _SNAPSHOT.clear()
+    _store(rows)
+    return True
+
+async def _run() -> None:
+    from ..db import AsyncSessionLocal
+    last_reconcile = monotonic()
+    while True:
+        await asyncio.sleep(settings.TEAM_STATS_REFRESH_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await flush_xp(db)
+                if monotonic() - last_reconcile >= settings.TEAM_STATS_RECONCILE_SECONDS:
+                    last_reconcile = monotonic()
+                    if await reconcile(db):
+                        print(f"✓ Team stats reconciled at {datetime.utcnow().isoformat()}")
+                        continue
+                await refresh_snapshot(db)
+        except Exception as e:
+            print(f"⚠ Team stats refresh failed: {e}")
+
+_TASK: asyncio.Task | None = None
+
+def start() -> None:
+    global _TASK
+    if _TASK is None:
+        _TASK = asyncio.create_task(_run())
+
+async def stop() -> None:
+    global _TASK
+    if _TASK is not None:
+        _TASK.cancel()
+        try:
+            await _TASK
+        except asyncio.CancelledError:
+            pass
+        _TASK = None
+    if _DELTAS:
+        from ..db import AsyncSessionLocal
+        try:
+            async with AsyncSessionLocal() as db:
+                await flush_xp(db)
+        except Exception as e:
+            print(f"⚠ Team stats flush failed ({len(_DELTAS)} users): {e}")
@@ -0,0 +1,76 @@
+from sqlalchemy import select, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Team, User, UserBattlePass
+from . import team_stats
+from .http_cache import CachedBody, encode
+
+class TeamRegistry:
+    """
+    Teams are near-static, so they live in memory: code/id indexes, the pre-serialized
+    /api/teams body and per-team member counts (kept current by services/team_stats).
+    """
+
+    def __init__(self):
+        self.by_code: dict[str, Team] = {}
+        self.by_id: dict[int, Team] = {}
+        self.members: dict[int, int] = {}
+        self.list_body: CachedBody = encode([])
+        self.loaded = False
+
+    async def refresh(self, db: AsyncSession) -> None:
+        teams = (await db.execute(select(Team).order_by(Team.id))).scalars().all()
+        counts = dict((await db.execute(
+            select(User.team_id, func.count()).where(User.team_id.is_not(None)).group_by(User.team_id)
+        )).all())
+        self.by_code = {t.code: t for t in teams}
+        self.by_id = {t.id: t for t in teams}
+        self.members = {t.id: counts.get(t.id, 0) for t in teams}
+        self.list_body = encode([{"code": t.code, "name": t.name} for t in teams])
+        self.loaded = True
+
+    def invalidate(self) -> None:
+        # Readers go through ensure_loaded, so the next one reloads
+        self.loaded = False
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        if not self.loaded:
+            await self.refresh(db)
+
+    def code_for(self, team_id: int | None) -> str | None:
+        team = self.by_id.get(team_id) if team_id is not None else None
+        return team.code if team else None
+
+    def pick_team_id(self) -> int | None:
+        """Least-populated team (lowest id on ties); None when no teams exist."""
+        if not self.members:
+            return None
+        return min(self.members, key=lambda tid: (self.members[tid], tid))
+
+registry = TeamRegistry()
+
+async def set_user_team(db: AsyncSession, user_id: int, team_id: int) -> tuple[bool, int | None]:
+    """Move a user to a team; returns (found, previous team id). Commits."""
+    old = (
+        select(
+            User.id,
+            User.team_id.label("old_team_id"),
+            func.coalesce(UserBattlePass.current_xp, 0).label("xp"),
+            func.coalesce(UserBattlePass.current_level, 1).label("level"),
+        )
+        .outerjoin(UserBattlePass, UserBattlePass.user_id == User.id)
+        .where(User.id == user_id)
+        .with_for_update(of=User)
+        .subquery()
+    )
+    res = await db.execute(
+        update(User).where(User.id == old.c.id).values(team_id=team_id)
+        .returning(old.c.old_team_id, old.c.xp, old.c.level)
+    )
+    row = res.first()
+    if row is None:
+        await db.rollback()
+        return False, None
+    # Also refreshes registry.members for both teams
+    await team_stats.move_member(db, row.old_team_id, team_id, row.xp, row.level)
+    await db.commit()
+    return True, row.old_team_id
@@ -0,0 +1,162 @@
+import csv
+import json
+from pathlib import Path
+from time import perf_counter
+from typing import Iterator
+from .arabic import normalize, normalize_root
+
+_CHUNK = 1 << 16
+_COLUMNS = ["word", "definition", "meta", "normalized_word", "root"]
+
+def _iter_json_array(f) -> Iterator[dict]:
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    dec = json.JSONDecoder()
+    buf, pos = f.read(_CHUNK), 0
+    while True:
+        # Skip whitespace, the opening bracket and separators; refill as needed
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,[":
+                pos += 1
+            if pos < len(buf):
+                break
+            more = f.read(_CHUNK)
+            if not more:
+                return
+            buf, pos = more, 0
+        if buf[pos] == "]":
+            return
+        try:
+            obj, end = dec.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            more = f.read(_CHUNK)
+            if not more:
+                raise
+            buf, pos = buf[pos:] + more, 0
+            continue
+        yield obj
+        pos = end
+        if pos >= _CHUNK:
+            buf, pos = buf[pos:], 0
+
+def _iter_ndjson(f) -> Iterator[dict]:
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def _iter_csv(f) -> Iterator[dict]:
+    # Columns: word, definition, root, source (multiple sources separated by "|")
+    for row in csv.DictReader(f):
+        if row.get("source"):
+            row["source"] = [s.strip() for s in row["source"].split("|") if s.strip()]
+        yield row
+
+_READERS = {"json": _iter_json_array, "ndjson": _iter_ndjson, "jsonl": _iter_ndjson, "csv": _iter_csv}
+
+def detect_format(path: Path) -> str:
+    fmt = path.suffix.lower().lstrip(".")
+    if fmt not in _READERS:
+        raise ValueError(f"Unknown word file format: {path.suffix} (expected .json, .ndjson or .csv)")
+    return fmt
+
+def iter_records(f, fmt: str) -> Iterator[tuple[str, str, str, str, str | None] | None]:
+    """(word, definition, meta json, normalized, normalized root) per item; None for unusable items."""
+    for item in _READERS[fmt](f):
+        word = (item.get("word") or "").strip()
+        definition = item.get("definition")
+        key = normalize(word)
+        if not key or not definition or len(word) > 128:
+            yield None
+            continue
+        meta = {"root": item.get("root"), "source": item.get("source")}
+        root = normalize_root(item.get("root"))[:32] or None
+        yield word, definition, json.dumps(meta, ensure_ascii=False), key, root
+
+class ImportReport:
+    def __init__(self):
+        self.read = 0
+        self.invalid = 0
+        self.inserted = 0
+        self.updated = 0
+        self.duplicates = 0
+        self.started = perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return perf_counter() - self.started
+
+    def line(self) -> str:
+        rate = self.read / self.elapsed if self.elapsed else 0.0
+        return (f"read={self.read} inserted={self.inserted} updated={self.updated} "
+                f"duplicates={self.duplicates} invalid={self.invalid} ({rate:,.0f} rows/s)")
+
+async def _write_batch(conn, batch: dict, update: bool, dry_run: bool, report: ImportReport) -> None:
+    """COPY a batch into a temp table, then upsert it on normalized_word in one statement."""
+    keys = list(batch)
+    if dry_run:
+        existing = await conn.fetchval(
+            "SELECT count(*) FROM dictionary_words WHERE normalized_word = ANY($1::varchar[])", keys
+        )
+        report.duplicates += existing
+        report.inserted += len(keys) - existing
+        return
+    async with conn.transaction():
+        await conn.execute(
+            "CREATE TEMP TABLE _word_import (word varchar(128), definition text, meta json, "
+            "normalized_word varchar(128), root varchar(32)) ON COMMIT DROP"
+        )
+        await conn.copy_records_to_table("_word_import", records=list(batch.values()), columns=_COLUMNS)
+        action = ("DO UPDATE SET definition = EXCLUDED.definition, meta = EXCLUDED.meta, root = EXCLUDED.root"
+                  if update else "DO NOTHING")
+        rows = await conn.fetch(
+            "INSERT INTO dictionary_words (word, definition, meta, normalized_word, root) "
+            "SELECT word, definition, meta, normalized_word, root FROM _word_import "
+            f"ON CONFLICT (normalized_word) {action} RETURNING (xmax = 0) AS inserted"
+        )
+    inserted = sum(1 for r in rows if r["inserted"])
+    report.inserted += inserted
+    report.updated += len(rows) - inserted
+    report.duplicates += len(keys) - len(rows)
+
+async def _import_file(conn, path: Path, fmt: str, batch_size: int, update: bool, dry_run: bool,
+                       progress, report: ImportReport) -> None:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        batch: dict[str, tuple] = {}
+        for rec in iter_records(f, fmt):
+            report.read += 1
+            if rec is None:
+                report.invalid += 1
+                continue
+            if rec[3] in batch:
+                report.duplicates += 1
+                continue
+            batch[rec[3]] = rec
+            if len(batch) >= batch_size:
+                await _write_batch(conn, batch, update, dry_run, report)
+                batch = {}
+                if progress:
+                    progress(report.line())
+        if batch:
+            await _write_batch(conn, batch, update, dry_run, report)
+
+async def import_words(path: Path, fmt: str | None = None, batch_size: int = 5000,
+                       update: bool = False, dry_run: bool = False, progress=print) -> ImportReport:
+    """Stream a word file into dictionary_words. Memory is bounded by one batch.
+    Once it's over (or fails part way) workers drop their word caches."""
+    from ..db import engine
+    from . import invalidation
+    fmt = fmt or detect_format(path)
+    report = ImportReport()
+    async with engine.connect() as sa_conn:
+        raw = await sa_conn.get_raw_connection()
+        conn = raw.driver_connection
+        try:
+            await _import_file(conn, path, fmt, batch_size, update, dry_run, progress, report)
+        finally:
+            # Once per import, not per batch: each event makes every worker rebuild its word index
+            if not dry_run and (report.inserted or report.updated):
+                await invalidation.publish_raw(conn, "words")
+                invalidation.HANDLERS["words"](None)
+    if progress:
+        progress(("[dry-run] " if dry_run else "") + f"done in {report.elapsed:.2f}s: " + report.line())
+    return report
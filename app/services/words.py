@@ -1,11 +1,17 @@
+import base64
 import json
 from pathlib import Path
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from zoneinfo import ZoneInfo
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..models import DictionaryWord, DailyOverride
+from ..models import DictionaryWord
 from ..config import settings
+from ..db import on_primary
+from . import schedule
+from .arabic import normalize
+from .http_cache import CachedBody, encode
+from .scoring import Answer
 
 _WORDS_CACHE: list[dict] | None = None
 _WORDS_PATH = Path(__file__).parent.parent / "data" / "arabic_100_with_roots_with_source.json"
@@ -26,6 +32,80 @@ def _load_words_file() -> list[dict]:
         _WORDS_CACHE = normalized
     return _WORDS_CACHE
 
+# normalized word -> dictionary_words.id (0 when built from the bundled JSON)
+_INDEX: dict[str, int] | None = None
+
+async def load_index(db: AsyncSession) -> dict[str, int]:
+    global _INDEX
+    index: dict[str, int] = {}
+    res = await db.stream(select(DictionaryWord.id, DictionaryWord.word))
+    async for word_id, word in res:
+        index.setdefault(normalize(word), word_id)
+    if not index:
+        index = {normalize(w["word"]): 0 for w in _load_words_file()}
+    _INDEX = index
+    return index
+
+async def get_index(db: AsyncSession) -> dict[str, int]:
+    return _INDEX if _INDEX is not None else await load_index(db)
+
+def invalidate_index() -> None:
+    global _INDEX
+    _INDEX = None
+
+# --- Dictionary browse/search (/api/words) ---
+# Keyset pages on (normalized_word, id): each page is one range scan of ix_dictionary_words_browse
+# (or ix_dictionary_words_root_browse), so page 5,000 costs the same as page 1.
+
+def encode_cursor(key: str, word_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([key, word_id], ensure_ascii=False).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """Raises ValueError for anything encode_cursor didn't produce."""
+    try:
+        key, word_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (TypeError, ValueError) as e:  # bad base64/utf-8/json, wrong shape
+        raise ValueError("bad cursor") from e
+    if not isinstance(key, str) or not isinstance(word_id, int):
+        raise ValueError("bad cursor")
+    return key, word_id
+
+def _prefix_end(prefix: str) -> str | None:
+    """Exclusive upper bound, in code point order, of the strings starting with prefix;
+    None when there is none (the prefix is all U+10FFFF)."""
+    prefix = prefix.rstrip("\U0010ffff")
+    if not prefix:
+        return None
+    nxt = ord(prefix[-1]) + 1
+    if 0xD800 <= nxt <= 0xDFFF:
+        # Surrogates can't be encoded (or stored); the next real character is U+E000
+        nxt = 0xE000
+    return prefix[:-1] + chr(nxt)
+
+async def browse(db: AsyncSession, prefix: str = "", root: str = "", after: tuple[str, int] | None = None,
+                 limit: int = 50) -> tuple[list, tuple[str, int] | None]:
+    """One page of words in normalized order, plus the keyset of the next page (None on the last).
+    prefix and root must already be normalized."""
+    w = DictionaryWord
+    stmt = select(w.id, w.word, w.normalized_word, w.root, w.definition, w.meta).where(w.normalized_word.is_not(None))
+    if root:
+        stmt = stmt.where(w.root == root)
+    if prefix:
+        # A range rather than LIKE 'prefix%': asyncpg's prepared statements may get a generic plan,
+        # and only explicit bounds stay index conditions there. "C" collation orders by code point,
+        # so bumping the last character gives the exact upper bound.
+        stmt = stmt.where(w.normalized_word >= prefix)
+        end = _prefix_end(prefix)
+        if end is not None:
+            stmt = stmt.where(w.normalized_word < end)
+    if after is not None:
+        stmt = stmt.where(tuple_(w.normalized_word, w.id) > tuple_(*after))
+    rows = (await db.execute(stmt.order_by(w.normalized_word, w.id).limit(limit + 1))).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1].normalized_word, rows[-1].id)
+
 def _riyadh_date(d: date | None = None) -> date:
     if d is not None:
         return d
@@ -39,22 +119,87 @@ def _index_for_date(d: date, total: int) -> int:
 
 async def get_daily_word(db: AsyncSession, for_date: date | None = None):
     d = _riyadh_date(for_date)
-    # Overrides take precedence
-    ov = await db.execute(select(DailyOverride).where(DailyOverride.date_key == d.isoformat()))
-    override = ov.scalar_one_or_none()
-    if override:
-        w = await db.get(DictionaryWord, override.dictionary_word_id)
-        return d.isoformat(), -1, w
-
-    # Try DB words first
-    all_ids_res = await db.execute(select(DictionaryWord.id))
-    ids = [row[0] for row in all_ids_res.all()]
-    if ids:
-        idx = _index_for_date(d, len(ids))
-        w = await db.get(DictionaryWord, ids[idx])
-        return d.isoformat(), idx, w
-
-    # Fallback to bundled JSON
+    day = schedule.day_index(d)
+    if day < 0 or day > schedule.day_index(_riyadh_date()) + settings.DAILY_SCHEDULE_MAX_AHEAD_DAYS:
+        raise ValueError(f"Date out of schedule range: {d.isoformat()}")
+
+    # Scheduled word with any DailyOverride merged in. Materializing new days is a write, so
+    # it (and the lookup that must see those rows) moves off a replica session
+    async with on_primary(db, when=schedule.needs_extension(day)) as db:
+        await schedule.ensure_schedule(db, day)
+        found = await schedule.lookup(db, day)
+    if found:
+        w, is_override = found
+        return d.isoformat(), -1 if is_override else day, w
+
+    # Fallback to bundled JSON (empty dictionary)
     words = _load_words_file()
     idx = _index_for_date(d, len(words))
     return d.isoformat(), idx, words[idx]
+
+# date key -> pre-encoded /api/daily body; dropped when that date's override changes
+_DAILY: dict[str, CachedBody] = {}
+_DAILY_MAX = 512
+
+def _store_daily(date_str: str, idx: int, w) -> CachedBody:
+    word, definition = (w["word"], w["definition"]) if isinstance(w, dict) else (w.word, w.definition)
+    cached = encode({"date": date_str, "index": idx, "word": word, "definition": definition})
+    if len(_DAILY) >= _DAILY_MAX:
+        _DAILY.clear()
+    _DAILY[date_str] = cached
+    return cached
+
+async def daily_body(db: AsyncSession, for_date: date | None = None) -> CachedBody:
+    d = _riyadh_date(for_date)
+    cached = _DAILY.get(d.isoformat())
+    if cached is None:
+        cached = _store_daily(*await get_daily_word(db, d))
+    return cached
+
+async def daily_bodies(db: AsyncSession, start: date, end: date) -> list[CachedBody]:
+    """Encoded daily entries for start..end inclusive. Days not cached yet are resolved
+    together: one schedule query for the whole span, whatever its length."""
+    first, last = schedule.day_index(start), schedule.day_index(end)
+    if first < 0 or last > schedule.day_index(_riyadh_date()) + settings.DAILY_SCHEDULE_MAX_AHEAD_DAYS:
+        raise ValueError(f"Range out of schedule range: {start.isoformat()}..{end.isoformat()}")
+    days = [start + timedelta(days=i) for i in range(last - first + 1)]
+    out = {d.isoformat(): _DAILY[d.isoformat()] for d in days if d.isoformat() in _DAILY}
+    missing = [d for d in days if d.isoformat() not in out]
+    if missing:
+        async with on_primary(db, when=schedule.needs_extension(last)) as db:
+            await schedule.ensure_schedule(db, last)
+            found = await schedule.lookup_range(db, schedule.day_index(missing[0]), schedule.day_index(missing[-1]))
+        for d in missing:
+            day = schedule.day_index(d)
+            if day in found:
+                w, is_override = found[day]
+                out[d.isoformat()] = _store_daily(d.isoformat(), -1 if is_override else day, w)
+            else:
+                # Fallback to bundled JSON (empty dictionary)
+                words = _load_words_file()
+                idx = _index_for_date(d, len(words))
+                out[d.isoformat()] = _store_daily(d.isoformat(), idx, words[idx])
+    return [out[d.isoformat()] for d in days]
+
+# date key -> prepared answer for /api/daily/guess
+_ANSWERS: dict[str, Answer] = {}
+
+async def daily_answer(db: AsyncSession, for_date: date | None = None) -> tuple[str, Answer]:
+    d = _riyadh_date(for_date)
+    key = d.isoformat()
+    answer = _ANSWERS.get(key)
+    if answer is None:
+        _, _, w = await get_daily_word(db, d)
+        answer = Answer(w["word"] if isinstance(w, dict) else w.word)
+        if len(_ANSWERS) >= _DAILY_MAX:
+            _ANSWERS.clear()
+        _ANSWERS[key] = answer
+    return key, answer
+
+def invalidate_daily(date_key: str | None = None) -> None:
+    if date_key is None:
+        _DAILY.clear()
+        _ANSWERS.clear()
+    else:
+        _DAILY.pop(date_key, None)
+        _ANSWERS.pop(date_key, None)
@@ -0,0 +1,160 @@
+import asyncio
+from time import perf_counter
+from sqlalchemy.exc import DataError, IntegrityError
+from ..config import settings
+
+class BufferFull(Exception):
+    """Raised by add() once a buffer holds max_pending entries; mapped to 503 in main.py."""
+
+class WriteBehindBuffer:
+    """
+    Base of the in-memory write-behind buffers (xp_buffer, game_results). Entries are keyed;
+    the subclass says how a new value joins a pending one (_merge), runs a batch's statements
+    (_write, committed here) and follows up on the result (_committed). Flushes run every
+    interval, or sooner once max_entries are pending. Entries leave _inflight at the commit.
+
+    A failed batch is put back and retried. After WRITE_BEHIND_ISOLATE_AFTER failures in a row
+    the entries are written one per transaction instead: the good ones land, and one that a
+    constraint rejects on its own (a deleted user, say) is dropped and logged rather than
+    holding back every batch after it. Any other error (the database is down) puts the rest back.
+    """
+    name = "buffer"
+
+    def __init__(self, interval_ms: int, max_entries: int, max_pending: int):
+        self.interval = interval_ms / 1000
+        self.max_entries = max_entries
+        self.max_pending = max_pending
+        self._pending: dict = {}
+        self._inflight: dict = {}
+        self._failed_in_row = 0
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        # metrics
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failures = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def _merge(self, into: dict, key, value) -> None:
+        raise NotImplementedError
+
+    async def _write(self, db, batch: dict):
+        raise NotImplementedError
+
+    def _committed(self, result) -> None:
+        pass
+
+    def _add(self, key, value) -> None:
+        if key not in self._pending and len(self._pending) >= self.max_pending:
+            self.rejected += 1
+            raise BufferFull(self.name)
+        self._merge(self._pending, key, value)
+        if len(self._pending) >= self.max_entries:
+            self._wake.set()
+
+    async def _write_batch(self, batch: dict) -> None:
+        """Write batch in one transaction. Once the commit succeeds its entries leave _inflight
+        (so reads adding them to stored values don't count them twice), and a later error, such
+        as closing the session, is only logged: retrying would apply the batch again."""
+        from ..db import AsyncSessionLocal
+        committed = False
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await self._write(db, batch)
+                await db.commit()
+                committed = True
+                for key in batch:
+                    del self._inflight[key]
+                self.flushed_rows += len(batch)
+                self._committed(result)
+        except Exception as e:
+            if not committed:
+                raise
+            print(f"⚠ {self.name}: error after commit ({len(batch)} entries written): {e}")
+
+    async def _write_each(self) -> None:
+        for key, value in list(self._inflight.items()):
+            try:
+                await self._write_batch({key: value})
+            except (IntegrityError, DataError) as e:
+                self.dropped += 1
+                del self._inflight[key]
+                print(f"⚠ {self.name}: dropped {key!r} -> {value!r} after {self._failed_in_row} failed flushes: {e}")
+
+    def _requeue(self) -> None:
+        # _inflight only holds entries whose write hasn't succeeded; keep them for the next attempt
+        for key, value in self._inflight.items():
+            self._merge(self._pending, key, value)
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            self._inflight, self._pending = self._pending, {}
+            t0 = perf_counter()
+            try:
+                if self._failed_in_row >= settings.WRITE_BEHIND_ISOLATE_AFTER:
+                    await self._write_each()
+                else:
+                    await self._write_batch(dict(self._inflight))
+            except Exception as e:
+                self._requeue()
+                self._failed_in_row += 1
+                self.failures += 1
+                print(f"⚠ {self.name} flush failed ({len(self._inflight)} entries): {e}")
+            except BaseException:
+                # Cancelled mid-write: the entries not yet written stay queued
+                self._requeue()
+                raise
+            else:
+                self._failed_in_row = 0
+                self.flushes += 1
+            finally:
+                self._inflight = {}
+                ms = (perf_counter() - t0) * 1000
+                self.last_flush_ms = ms
+                self.max_flush_ms = max(self.max_flush_ms, ms)
+                self.total_flush_ms += ms
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # Not cancelled: a flush cut off mid-write would lose its batch. The loop finishes the
+        # flush it's in (or runs one now) and exits; the last flush picks up anything added since
+        if self._task is not None:
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._pending),
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+        }
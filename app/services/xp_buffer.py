@@ -0,0 +1,67 @@
+import sys
+from typing import NamedTuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from . import battlepass, leaderboard
+from .write_behind import WriteBehindBuffer
+
+_FLUSH_CHUNK = 1000  # rows per upsert statement (4 bind params each)
+
+class Progress(NamedTuple):
+    season: str
+    current_level: int
+    current_xp: int
+    next_level_xp: int
+
+class XPBuffer(WriteBehindBuffer):
+    """
+    Write-behind buffer for XP grants. Grants are summed per user in memory and written
+    with one bulk upsert every XP_FLUSH_INTERVAL_MS, or sooner once XP_FLUSH_MAX_ENTRIES
+    users are pending. Pending XP stays visible to reads through pending().
+    """
+    name = "XP buffer"
+
+    def add(self, user_id: int, amount: int) -> None:
+        self._add(user_id, amount)
+
+    def pending(self, user_id: int) -> int:
+        return self._pending.get(user_id, 0) + self._inflight.get(user_id, 0)
+
+    def _merge(self, into: dict, key, value) -> None:
+        into[key] = into.get(key, 0) + value
+
+    async def _write(self, db: AsyncSession, batch: dict) -> dict:
+        # Chunks in user id order too, for the same lock ordering across statements
+        items = sorted(batch.items())
+        rows = {}
+        for i in range(0, len(items), _FLUSH_CHUNK):
+            rows.update(await battlepass.grant_xp(db, dict(items[i:i + _FLUSH_CHUNK])))
+        return rows
+
+    def _committed(self, rows: dict) -> None:
+        for r in rows.values():
+            leaderboard.record(r.season, r.user_id, r.current_xp)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "pending_xp": sum(self._pending.values())}
+
+# Uncapped: add() must not fail, a grant has nowhere else to go
+buffer = XPBuffer(settings.XP_FLUSH_INTERVAL_MS, settings.XP_FLUSH_MAX_ENTRIES, sys.maxsize)
+
+async def get_progress(db: AsyncSession, user_id: int) -> Progress:
+    """Stored progress with any buffered XP applied on top."""
+    prog, next_xp = await battlepass.get_progress(db, user_id)
+    extra = buffer.pending(user_id)
+    if not extra:
+        return Progress(prog.season, prog.current_level, prog.current_xp, next_xp)
+    tiers = await battlepass.get_tiers(db, prog.season)
+    xp = prog.current_xp + extra
+    level = max(prog.current_level, tiers.level_for_xp(xp))
+    return Progress(prog.season, level, xp, tiers.next_level_xp(level))
+
+async def add_xp(db: AsyncSession, user_id: int, amount: int) -> Progress:
+    if not settings.XP_WRITE_BEHIND:
+        prog, next_xp = await battlepass.add_xp(db, user_id, amount)
+        return Progress(prog.season, prog.current_level, prog.current_xp, next_xp)
+    buffer.add(user_id, amount)
+    return await get_progress(db, user_id)
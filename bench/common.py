@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "bench" / "results"
+
+def percentiles(samples_ms: list[float]) -> dict:
+    if not samples_ms:
+        return {"n": 0}
+    s = sorted(samples_ms)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))]
+    return {
+        "n": len(s),
+        "mean_ms": round(sum(s) / len(s), 3),
+        "p50_ms": round(pick(0.50), 3),
+        "p95_ms": round(pick(0.95), 3),
+        "p99_ms": round(pick(0.99), 3),
+        "max_ms": round(s[-1], 3),
+    }
+
+class Recorder:
+    """Latency samples and status counts per endpoint label."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+        self.statuses: dict[str, dict[str, int]] = {}
+        self.errors: dict[str, int] = {}
+
+    def add(self, label: str, ms: float, status: int | None) -> None:
+        self.samples.setdefault(label, []).append(ms)
+        by_status = self.statuses.setdefault(label, {})
+        key = str(status) if status is not None else "error"
+        by_status[key] = by_status.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+    def summary(self, elapsed_s: float) -> dict:
+        return {
+            label: {
+                **percentiles(samples),
+                "rps": round(len(samples) / elapsed_s, 1) if elapsed_s else 0.0,
+                "statuses": self.statuses[label],
+                "errors": self.errors.get(label, 0),
+            }
+            for label, samples in self.samples.items()
+        }
+
+def git_revision() -> str:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "") if rev else "unknown"
+    except OSError:
+        return "unknown"
+
+def write_results(kind: str, name: str, payload: dict, out_dir: Path | None = None) -> Path:
+    out_dir = out_dir or RESULTS_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rev = git_revision()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    doc = {"kind": kind, "name": name, "revision": rev, "created_at": stamp, "python": sys.version.split()[0], **payload}
+    path = out_dir / f"{stamp}-{rev}-{kind}-{name}.json"
+    path.write_text(json.dumps(doc, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+def print_table(results: dict) -> None:
+    print(f"{'endpoint':40} {'n':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'err':>5}")
+    for label, r in results.items():
+        if not r.get("n"):
+            continue
+        print(f"{label:40} {r['n']:>7} {r.get('rps', 0):>8} {r['p50_ms']:>8} {r['p95_ms']:>8} "
+              f"{r['p99_ms']:>8} {r['max_ms']:>8} {r.get('errors', 0):>5}")
+
+def start_server(port: int, workers: int, env: dict | None = None) -> subprocess.Popen:
+    """uvicorn app.main:app in a subprocess, using the current DATABASE_URL unless overridden."""
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    return subprocess.Popen(cmd, cwd=ROOT, env={**os.environ, **(env or {})})
+
+def wait_ready(base_url: str, server: subprocess.Popen | None = None, timeout: float = 60.0) -> None:
+    import httpx
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"server at {base_url} did not become ready in {timeout:.0f}s")
@@ -0,0 +1,38 @@
+"""
+Compare two bench result files (same kind/name), e.g. before and after a change.
+
+    python -m bench.compare bench/results/<old>.json bench/results/<new>.json
+
+Latency deltas are new vs old; negative is faster. Throughput deltas: positive is better.
+"""
+import argparse
+import json
+from pathlib import Path
+
+FIELDS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+def _cell(old, new) -> str:
+    delta = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+    return f"{old}→{new} ({delta})"
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("old", type=Path)
+    p.add_argument("new", type=Path)
+    args = p.parse_args()
+    old = json.loads(args.old.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    if (old["kind"], old["name"]) != (new["kind"], new["name"]):
+        print(f"⚠ comparing {old['kind']}/{old['name']} with {new['kind']}/{new['name']}")
+    print(f"{old['revision']} → {new['revision']}")
+    print(f"{'endpoint':40} " + " ".join(f"{f:>28}" for f in FIELDS))
+    for label in sorted(set(old["results"]) | set(new["results"])):
+        o, n = old["results"].get(label), new["results"].get(label)
+        if o is None or n is None:
+            print(f"{label:40} only in {'new' if o is None else 'old'}")
+            continue
+        cells = [f"{_cell(o.get(f, 0), n.get(f, 0)):>28}" for f in FIELDS]
+        print(f"{label:40} " + " ".join(cells))
+
+if __name__ == "__main__":
+    main()
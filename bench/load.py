@@ -0,0 +1,142 @@
+"""
+HTTP load mixes against a running app (or one started here with uvicorn).
+
+    python -m bench.load --mix all --workers 2 --concurrency 50 --duration 20
+    python -m bench.load --mix daily --base-url http://127.0.0.1:8000
+
+Mixes:
+  auth   register burst, then login burst for the same accounts
+  daily  midnight spike: every client hammers GET /api/daily at once
+  xp     steady POST /battlepass/add_xp + GET /battlepass/me per user
+
+Creates bench-* users, so point DATABASE_URL at a throwaway database. A server started
+here runs with RATE_LIMIT_ENABLED=0 (every client shares one IP); do the same for --base-url.
+Results go to bench/results/*.json (compare runs with bench.compare).
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from time import perf_counter
+import httpx
+from .common import Recorder, print_table, start_server, wait_ready, write_results
+
+PASSWORD = "bench-password-1"
+
+async def _call(client: httpx.AsyncClient, rec: Recorder, label: str, method: str, url: str, **kwargs):
+    t0 = perf_counter()
+    try:
+        resp = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        rec.add(label, (perf_counter() - t0) * 1000, None)
+        return None
+    rec.add(label, (perf_counter() - t0) * 1000, resp.status_code)
+    return resp
+
+async def _gather_limited(concurrency: int, jobs):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def run(job):
+        async with sem:
+            return await job
+
+    return await asyncio.gather(*(run(j) for j in jobs))
+
+async def _register_users(client: httpx.AsyncClient, rec: Recorder, n: int, concurrency: int,
+                          label: str = "POST /api/auth/register") -> list[tuple[str, str]]:
+    run_id = uuid.uuid4().hex[:8]
+    emails = [f"bench-{run_id}-{i}@example.com" for i in range(n)]
+    resps = await _gather_limited(concurrency, (
+        _call(client, rec, label, "POST", "/api/auth/register",
+              json={"email": e, "password": PASSWORD, "display_name": f"bench {i}"})
+        for i, e in enumerate(emails)
+    ))
+    return [(e, r.json()["access_token"]) for e, r in zip(emails, resps) if r is not None and r.status_code == 200]
+
+async def _for_duration(duration: float, concurrency: int, body) -> float:
+    t0 = perf_counter()
+    deadline = t0 + duration
+
+    async def worker(i: int):
+        while perf_counter() < deadline:
+            await body(i)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return perf_counter() - t0
+
+# Each mix returns the wall time of its measured phase (setup excluded)
+async def mix_auth(client, rec, args) -> float:
+    t0 = perf_counter()
+    users = await _register_users(client, rec, args.users, args.concurrency)
+    await _gather_limited(args.concurrency, (
+        _call(client, rec, "POST /api/auth/login", "POST", "/api/auth/login",
+              json={"email": email, "password": PASSWORD})
+        for email, _ in users
+    ))
+    return perf_counter() - t0
+
+async def mix_daily(client, rec, args) -> float:
+    async def body(i):
+        await _call(client, rec, "GET /api/daily", "GET", "/api/daily")
+    return await _for_duration(args.duration, args.concurrency, body)
+
+async def mix_xp(client, rec, args) -> float:
+    setup = Recorder()
+    users = await _register_users(client, setup, min(args.users, args.concurrency), args.concurrency)
+    if not users:
+        raise RuntimeError("could not register bench users")
+    headers = [{"Authorization": f"Bearer {token}"} for _, token in users]
+
+    async def body(i):
+        h = headers[i % len(headers)]
+        await _call(client, rec, "POST /api/battlepass/add_xp", "POST",
+                    f"/api/battlepass/add_xp/{random.randint(5, 50)}", headers=h)
+        await _call(client, rec, "GET /api/battlepass/me", "GET", "/api/battlepass/me", headers=h)
+    return await _for_duration(args.duration, args.concurrency, body)
+
+MIXES = {"auth": mix_auth, "daily": mix_daily, "xp": mix_xp}
+
+async def run_mix(name: str, base_url: str, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        rec = Recorder()
+        elapsed = await MIXES[name](client, rec, args)
+    results = rec.summary(elapsed)
+    print(f"\n== {name}: {elapsed:.1f}s")
+    print_table(results)
+    return {"elapsed_s": round(elapsed, 3), "results": results}
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--mix", choices=[*MIXES, "all"], default="all")
+    p.add_argument("--base-url", help="Use a running server instead of starting one")
+    p.add_argument("--port", type=int, default=8799)
+    p.add_argument("--workers", type=int, default=1, help="uvicorn workers when starting the server here")
+    p.add_argument("--concurrency", type=int, default=50)
+    p.add_argument("--duration", type=float, default=15.0, help="Seconds per timed mix (daily, xp)")
+    p.add_argument("--users", type=int, default=200, help="Accounts for the auth mix")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--no-save", action="store_true")
+    args = p.parse_args()
+    random.seed(args.seed)
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        base_url = f"http://127.0.0.1:{args.port}"
+        server = start_server(args.port, args.workers, {"RATE_LIMIT_ENABLED": "0"})
+    try:
+        wait_ready(base_url, server)
+        for name in (MIXES if args.mix == "all" else [args.mix]):
+            out = asyncio.run(run_mix(name, base_url, args))
+            if not args.no_save:
+                config = {k: v for k, v in vars(args).items() if k not in ("no_save",)}
+                path = write_results("load", name, {"config": config, **out})
+                print(f"→ {path}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+if __name__ == "__main__":
+    main()
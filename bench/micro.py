@@ -0,0 +1,88 @@
+"""
+In-process micro-benchmarks for the hot paths, against DATABASE_URL.
+
+    python -m bench.micro                      # all
+    python -m bench.micro --only verify_password --iterations 50
+
+  get_daily_word   services.words.get_daily_word on one session (schedule lookup)
+  add_xp           services.battlepass.add_xp for one bench user (upsert + commit)
+  verify_password  security.verify_password at the configured BCRYPT_ROUNDS
+
+Results go to bench/results/*.json (compare runs with bench.compare).
+"""
+import argparse
+import asyncio
+import uuid
+from time import perf_counter
+from .common import percentiles, print_table, write_results
+
+async def _timed(fn, iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await fn()
+    samples = []
+    t0 = perf_counter()
+    for _ in range(iterations):
+        s = perf_counter()
+        await fn()
+        samples.append((perf_counter() - s) * 1000)
+    elapsed = perf_counter() - t0
+    return {**percentiles(samples), "rps": round(iterations / elapsed, 1) if elapsed else 0.0}
+
+async def bench_get_daily_word(iterations: int, warmup: int) -> dict:
+    from app.db import AsyncSessionLocal
+    from app.services.words import get_daily_word
+    async with AsyncSessionLocal() as db:
+        return await _timed(lambda: get_daily_word(db), iterations, warmup)
+
+async def bench_add_xp(iterations: int, warmup: int) -> dict:
+    from app.db import AsyncSessionLocal
+    from app.models import User
+    from app.services.battlepass import add_xp
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"bench-micro-{uuid.uuid4().hex[:8]}@example.com", display_name="bench micro")
+        db.add(user)
+        await db.commit()
+        return await _timed(lambda: add_xp(db, user.id, 10), iterations, warmup)
+
+async def bench_verify_password(iterations: int, warmup: int) -> dict:
+    from app.security import hash_password, verify_password
+    hashed = hash_password("bench-password-1")
+
+    async def verify():
+        verify_password("bench-password-1", hashed)
+    return await _timed(verify, iterations, warmup)
+
+BENCHES = {
+    "get_daily_word": (bench_get_daily_word, 2000),
+    "add_xp": (bench_add_xp, 500),
+    "verify_password": (bench_verify_password, 20),
+}
+
+async def run(names: list[str], iterations: int | None, warmup: int) -> dict:
+    results = {}
+    for name in names:
+        fn, default_iterations = BENCHES[name]
+        results[name] = await fn(iterations or default_iterations, warmup)
+    from app.db import engine
+    await engine.dispose()
+    return results
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--only", choices=list(BENCHES), action="append", help="Repeatable; default runs all")
+    p.add_argument("--iterations", type=int, help="Override the per-benchmark default")
+    p.add_argument("--warmup", type=int, default=5)
+    p.add_argument("--no-save", action="store_true")
+    args = p.parse_args()
+
+    from app.config import settings
+    names = args.only or list(BENCHES)
+    results = asyncio.run(run(names, args.iterations, args.warmup))
+    print_table(results)
+    if not args.no_save:
+        config = {"iterations": args.iterations, "warmup": args.warmup, "bcrypt_rounds": settings.BCRYPT_ROUNDS}
+        path = write_results("micro", "-".join(names) if args.only else "all", {"config": config, "results": results})
+        print(f"→ {path}")
+
+if __name__ == "__main__":
+    main()